@@ -0,0 +1,95 @@
+import asyncio
+import os
+import aiohttp
+from dotenv import load_dotenv
+from html_extractor import EXTRACTOR, extract_response
+from http_cache import get_article_cache
+
+
+load_dotenv()
+# Point at a local stand-in (news_replay.py serve) to run without newsapi.org
+NEWS_API_URL = os.getenv('NEWS_API_URL', 'https://newsapi.org/v2')
+MAX_CONNECTIONS = 32
+MAX_CONNECTIONS_PER_HOST = 4
+MAX_CONCURRENT_DOWNLOADS = 6
+REQUEST_TIMEOUT = 15
+_session = None
+_session_loop = None
+
+
+def get_session():
+    """Return the process-wide pooled aiohttp session, creating it for the running loop if needed."""
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS, limit_per_host=MAX_CONNECTIONS_PER_HOST, ttl_dns_cache=300)
+        _session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT))
+        _session_loop = loop
+    return _session
+
+
+async def close_session():
+    global _session, _session_loop
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    _session_loop = None
+
+
+async def fetch_first(candidates, fetch_one, wanted, concurrency=MAX_CONCURRENT_DOWNLOADS):
+    """Run fetch_one over the candidates concurrently until `wanted` of them return a result.
+
+    fetch_one returns None for candidates that fail or are rejected. Once enough
+    results have been accepted the remaining downloads are cancelled. Accepted
+    results are returned in candidate order.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def attempt(index, candidate):
+        async with semaphore:
+            return index, await fetch_one(candidate)
+
+    tasks = [asyncio.create_task(attempt(index, candidate)) for index, candidate in enumerate(candidates)]
+    accepted = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                index, result = await next_done
+            except Exception:
+                continue
+            if result is not None:
+                accepted.append((index, result))
+                if len(accepted) >= wanted:
+                    break
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    accepted.sort(key=lambda item: item[0])
+    return [result for _, result in accepted]
+
+
+async def fetch_article_text(session, url, timings=None):
+    """Download and extract an article, reusing the cached text when the page has not changed."""
+    cache = get_article_cache()
+    entry = await asyncio.to_thread(cache.get, url, EXTRACTOR)
+    if cache.is_fresh(entry):
+        cache.record(url, 'fresh')
+        return entry['text']
+
+    async def extract_and_store(response):
+        article_text = await extract_response(response, timings=timings)
+        stored = response.status == 200 and await asyncio.to_thread(cache.put, url, EXTRACTOR, response.headers, article_text)
+        cache.record(url, 'uncacheable' if not stored else 'changed' if entry is not None else 'miss')
+        return article_text
+
+    async with session.get(url, headers=cache.conditional_headers(entry)) as response:
+        if response.status != 304:
+            return await extract_and_store(response)
+        if entry is not None:
+            await asyncio.to_thread(cache.refresh, url, EXTRACTOR, entry, response.headers)
+            cache.record(url, 'revalidated')
+            return entry['text']
+    # A 304 with nothing cached to reuse has an empty body, so ask again for the full page.
+    async with session.get(url, headers={'Cache-Control': 'no-cache'}) as response:
+        return await extract_and_store(response)
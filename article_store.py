@@ -0,0 +1,119 @@
+import hashlib
+import os
+import time
+from datetime import datetime
+
+
+ARTICLE_TTL = 7 * 24 * 3600
+# Newest articles kept per category index; older ones drop out of the listing
+CATEGORY_INDEX_MAX = int(os.getenv('CATEGORY_INDEX_MAX', '200'))
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+ARTICLE_FIELDS = ('id', 'title', 'summary', 'author', 'source', 'image', 'url', 'published_at', 'tier')
+# Stored as '' in Redis hashes, returned as None
+NULLABLE_FIELDS = {'author', 'image', 'url', 'published_at'}
+
+
+def article_id(article):
+    return hashlib.sha1((article.get('url') or article['title']).encode()).hexdigest()[:16]
+
+
+def article_key(article_id):
+    return f'news:article:{article_id}'
+
+
+def category_index_key(category):
+    return f'news:category:{category}'
+
+
+def publish_timestamp(article):
+    published_at = article.get('published_at')
+    if published_at:
+        try:
+            return datetime.fromisoformat(published_at.replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+def encode_cursor(score, article_id):
+    return f'{score!r}:{article_id}'
+
+
+def decode_cursor(cursor):
+    """(score, article_id) from a cursor, raises ValueError for a malformed one"""
+    score, _, article_id = cursor.partition(':')
+    if not article_id:
+        raise ValueError(f'bad cursor {cursor!r}')
+    return float(score), article_id
+
+
+class ArticleStore:
+    """Articles as individual Redis hashes, listed newest first through one sorted set per category.
+
+    Scores are publish times and members are article ids, so a page is a
+    bounded ZREVRANGEBYSCORE plus one HMGET per article, and the cursor is
+    the (score, id) of the last article on the previous page. Members with
+    equal scores come back in reverse id order, which the cursor uses to
+    break ties.
+    """
+
+    def __init__(self, redis_client, ttl=ARTICLE_TTL, index_max=CATEGORY_INDEX_MAX):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.index_max = index_max
+
+    async def index(self, category, articles):
+        """Store a category's freshly summarized articles and add them to its index"""
+        if not articles:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        scores = {}
+        for article in articles:
+            identifier = article_id(article)
+            fields = dict(article, id=identifier)
+            mapping = {field: '' if fields.get(field) is None else str(fields[field]) for field in ARTICLE_FIELDS}
+            pipe.hset(article_key(identifier), mapping=mapping)
+            pipe.expire(article_key(identifier), self.ttl)
+            scores[identifier] = publish_timestamp(article)
+        index_key = category_index_key(category)
+        pipe.zadd(index_key, scores)
+        pipe.zremrangebyrank(index_key, 0, -self.index_max - 1)
+        pipe.expire(index_key, self.ttl)
+        await pipe.execute()
+
+    async def page(self, category, cursor=None, limit=DEFAULT_PAGE_SIZE, fields=ARTICLE_FIELDS):
+        """Return (articles, next_cursor); next_cursor is None on the last page"""
+        index_key = category_index_key(category)
+        fields = ['id'] + [field for field in fields if field != 'id']
+        if cursor is None:
+            entries = await self.redis.zrevrangebyscore(index_key, '+inf', '-inf', start=0, num=limit + 1, withscores=True)
+        else:
+            score, last_id = decode_cursor(cursor)
+            # Articles sharing the cursor's score may sit on either side of it, so fetch past all of them.
+            ties = await self.redis.zcount(index_key, score, score)
+            entries = await self.redis.zrevrangebyscore(index_key, score, '-inf', start=0, num=limit + 1 + ties, withscores=True)
+            entries = [(member, member_score) for member, member_score in entries
+                       if member_score < score or member < last_id][:limit + 1]
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        pipe = self.redis.pipeline(transaction=False)
+        for member, _ in entries:
+            pipe.hmget(article_key(member), fields)
+        stored = await pipe.execute() if entries else []
+        articles = []
+        expired = []
+        for (member, _), values in zip(entries, stored):
+            if values[0] is None:
+                expired.append(member)
+                continue
+            articles.append({field: None if value == '' and field in NULLABLE_FIELDS else value
+                             for field, value in zip(fields, values)})
+        if expired:
+            # Hashes expire on their own; their index entries are dropped when a read runs into them.
+            await self.redis.zrem(index_key, *expired)
+        next_cursor = None
+        if has_more:
+            last_member, last_score = entries[-1]
+            next_cursor = encode_cursor(last_score, last_member)
+        return articles, next_cursor
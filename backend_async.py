@@ -1,10 +1,9 @@
 import asyncio
 from dotenv import load_dotenv
 import os
-import aiohttp
-from bs4 import BeautifulSoup
-from transformers import pipeline
-from concurrent.futures import ThreadPoolExecutor
+from article_fetcher import NEWS_API_URL, close_session, fetch_first, get_session
+from html_extractor import extract_response
+from summarizer_pool import get_pool
 
 
 load_dotenv()
@@ -22,73 +21,51 @@ lock = asyncio.Lock()
 
 async def get_article_contents(category):
     if category == 'default':
-        url = f'https://newsapi.org/v2/top-headlines?country=us&apiKey={api_key}'
+        url = f'{NEWS_API_URL}/top-headlines?country=us&apiKey={api_key}'
     else:
-        url = f'https://newsapi.org/v2/top-headlines?category={category}&apiKey={api_key}'
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            data = await response.json()
-            article_contents = await fetch_article_data(data)
-            # article_contents = run_data[0]
-            # number_of_runs = 1
-            # while len(article_contents) < MAX_ENTRIES:
-            #     first_article_index = number_of_runs * MAX_ENTRIES
-            #     run_data = await fetch_article_data(data, first_article_index, MAX_ENTRIES+run_data[2])
-            #     number_of_runs+=1
-            #     article_contents.update(run_data[0])
+        url = f'{NEWS_API_URL}/top-headlines?category={category}&apiKey={api_key}'
+    session = get_session()
+    async with session.get(url) as response:
+        data = await response.json()
+    article_contents = await fetch_article_data(data)
     return article_contents
 
 
+async def fetch_article(session, article):
+    article_title = article['title']
+    article_url = article['url']
+    try:
+        async with session.get(article_url) as response:
+            article_text = await extract_response(response)
+        content = article_text
+        word_list = content.split()
+        if (len(word_list) > 200):
+            return article_title, article_text
+    except Exception as e:
+        print(f'Could not fetch content for Article: {article_title}. Error {e}')
+    return None
+
+
 async def fetch_article_data(DATA):
-    download_successes = 0
-    article_data = {}
     articles = DATA['articles']
-    async with aiohttp.ClientSession() as session:
-        for article in articles:
-            if download_successes < MAX_ENTRIES:
-                article_title = article['title']
-                article_url = article['url']
-                try:
-                    async with session.get(article_url) as response:
-                        html = await response.text()
-                        parsed = BeautifulSoup(html, 'html.parser')
-                        paragraphs = parsed.find_all('p')
-                        article_text = ' '.join(p.text for p in paragraphs)
-                        content = article_text
-                        word_list = content.split()
-                        if (len(word_list) > 200):
-                            article_data[article_title] = article_text
-                            download_successes+=1
-                except Exception as e:
-                    print(f'Could not fetch content for Article: {article_title}. Error {e}')
-                    download_fails+=1
-            else:
-                break
-    return article_data
-
-
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-executor = ThreadPoolExecutor(max_workers=2)
-summarize_semaphore = asyncio.Semaphore(2)
+    # Candidates download concurrently and the rest are cancelled once MAX_ENTRIES pass the word filter.
+    session = get_session()
+    accepted = await fetch_first(articles, lambda article: fetch_article(session, article), MAX_ENTRIES)
+    return dict(accepted)
 
 
 def summarize_article(article_text):
-    summary = summarizer(article_text, max_length=MAXIMUM_SUMMARY_LENGTH, min_length=MINIMUM_SUMMARY_LENGTH, do_sample=False)
-    return summary
+    return get_pool().summarize([article_text], MINIMUM_SUMMARY_LENGTH, MAXIMUM_SUMMARY_LENGTH)[0]
 
 
 async def summarize_article_async(article_text):
-    async with summarize_semaphore:
-        loop = asyncio.get_running_loop()
-        summary_info = await loop.run_in_executor(executor, summarize_article, article_text)
-        summary = summary_info[0]['summary_text']
-        return summary
+    summaries = await get_pool().summarize_async([article_text], MINIMUM_SUMMARY_LENGTH, MAXIMUM_SUMMARY_LENGTH)
+    return summaries[0]
 
 
 async def get_summaries(ARTICLE_CONTENTS):
     summaries = {}
     for title, content in ARTICLE_CONTENTS.items():
-        content = content[:1024]
         summarized_content = await summarize_article_async(content)
         summaries[title] = summarized_content
     return summaries
@@ -127,6 +104,13 @@ async def main():
     return all_summaries
 
 
+async def run_once():
+    try:
+        return await main()
+    finally:
+        await close_session()
+
+
 if __name__ == '__main__':
-    print(asyncio.run(main()))
+    print(asyncio.run(run_once()))
 
@@ -1,157 +1,259 @@
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from functools import partial
 import time
 import os
-import aiohttp
-from bs4 import BeautifulSoup
-from transformers import pipeline
-from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import metrics
+from article_fetcher import NEWS_API_URL, close_session, fetch_article_text, fetch_first, get_session
+from batch_summarizer import BatchSummarizer
+from summarizer_pool import MODEL_NAME, SUMMARIZER_WORKERS, get_pool
+from inference_scheduler import DEFAULT_PRIORITY, PRIORITY_CLASSES
+from summary_store import SummaryStore
+from tiering import TierScheduler
+from sentence_ranker import condense
+from dedup import NearDuplicateIndex, SharedSummaries, minhash_signature
 
 
 load_dotenv()
 api_key = os.getenv('NEWS_API_KEY')
 categories = ['default', 'business', 'entertainment', 'sports', 'technology', 'science', 'health']
-category_queues = {category: asyncio.Queue() for category in categories}
 producers = {f'Producer-{category}': category for category in categories}
 consumers = {f'Consumer-{category}': category for category in categories}
-MAX_ENTRIES = 3
+MAX_ENTRIES = int(os.getenv('MAX_ENTRIES', '3'))
 MINIMUM_SUMMARY_LENGTH = 130
 MAXIMUM_SUMMARY_LENGTH = 200
-all_summaries = {}
-lock = asyncio.Lock()
 
 
-async def get_article_contents(category):
+async def get_article_list(category):
     if category == 'default':
-        url = f'https://newsapi.org/v2/top-headlines?country=us&apiKey={api_key}'
+        url = f'{NEWS_API_URL}/top-headlines?country=us&apiKey={api_key}'
     else:
-        url = f'https://newsapi.org/v2/top-headlines?category={category}&apiKey={api_key}'
-    async with aiohttp.ClientSession() as session:
+        url = f'{NEWS_API_URL}/top-headlines?category={category}&apiKey={api_key}'
+    session = get_session()
+    with metrics.stage('newsapi', category=category):
         async with session.get(url) as response:
-            data = await response.json()
-            article_contents = await fetch_article_data(data)
-            # article_contents = run_data[0]
-            # number_of_runs = 1
-            # while len(article_contents) < MAX_ENTRIES:
-            #     first_article_index = number_of_runs * MAX_ENTRIES
-            #     run_data = await fetch_article_data(data, first_article_index, MAX_ENTRIES+run_data[2])
-            #     number_of_runs+=1
-            #     article_contents.update(run_data[0])
+            return await response.json()
+
+
+async def get_article_contents(category):
+    data = await get_article_list(category)
+    article_contents = await fetch_article_data(data)
     return article_contents
 
 
+async def fetch_article(session, article, accepted_index=None):
+    article_title = article['title']
+    article_url = article['url']
+    article_author = article['author']
+    article_source = article['source']['name']
+    article_image = article['urlToImage']
+    host = urlparse(article_url).hostname or ''
+    timings = {}
+    start_time = time.perf_counter()
+    try:
+        article_text = await fetch_article_text(session, article_url, timings)
+        content = article_text
+        word_list = content.split()
+        if (len(word_list) > 200):
+            if accepted_index is not None:
+                # A near duplicate of an article already in this category leaves the slot to another candidate.
+                signature = minhash_signature(article_text)
+                if accepted_index.find(signature) is not None:
+                    print(f'Skipping near-duplicate Article: {article_title}')
+                    metrics.articles_total.inc(host=host, outcome='duplicate')
+                    return None
+                accepted_index.add(article_url, signature)
+            metrics.articles_total.inc(host=host, outcome='accepted')
+            return article_title, {'text': article_text, 'author': article_author, 'source': article_source, 'image': article_image, 'url': article_url,
+                                   'published_at': article.get('publishedAt')}
+        metrics.articles_total.inc(host=host, outcome='too_short')
+    except asyncio.CancelledError:
+        metrics.articles_total.inc(host=host, outcome='cancelled')
+        raise
+    except Exception as e:
+        print(f'Could not fetch content for Article: {article_title}. Error {e}')
+        metrics.articles_total.inc(host=host, outcome='error')
+    finally:
+        # Download is the request time left over once HTML parsing is taken out.
+        extract_seconds = timings.get('extract', 0.0)
+        metrics.observe_stage('download', time.perf_counter() - start_time - extract_seconds, host=host)
+        metrics.observe_stage('extract', extract_seconds, host=host)
+    return None
+
+
 async def fetch_article_data(DATA):
-    download_successes = 0
-    article_data = {}
     if 'articles' not in DATA:
         articles = []
         print("error, key 'articles'  not found in DATA")
     else:
         articles = DATA['articles']
-    async with aiohttp.ClientSession() as session:
-        for article in articles:
-            if download_successes < MAX_ENTRIES:
-                article_title = article['title']
-                article_url = article['url']
-                article_author = article['author']
-                article_source = article['source']['name']
-                article_image = article['urlToImage']
-                try:
-                    async with session.get(article_url) as response:
-                        html = await response.text()
-                        parsed = BeautifulSoup(html, 'html.parser')
-                        paragraphs = parsed.find_all('p')
-                        article_text = ' '.join(p.text for p in paragraphs)
-                        content = article_text
-                        word_list = content.split()
-                        if (len(word_list) > 200):
-                            article_data[article_title] = {'text': article_text, 'author': article_author, 'source': article_source, 'image': article_image}
-                            download_successes+=1
-                except Exception as e:
-                    print(f'Could not fetch content for Article: {article_title}. Error {e}')
-            else:
-                break
-    return article_data
-
-
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-executor = ThreadPoolExecutor(max_workers=2)
-summarize_semaphore = asyncio.Semaphore(2)
+    # Candidates download concurrently and the rest are cancelled once MAX_ENTRIES pass the word filter.
+    session = get_session()
+    accepted_index = NearDuplicateIndex()
+    accepted = await fetch_first(articles, lambda article: fetch_article(session, article, accepted_index), MAX_ENTRIES)
+    return dict(accepted)
 
 
 def summarize_article(article_text):
-    summary = summarizer(article_text, max_length=MAXIMUM_SUMMARY_LENGTH, min_length=MINIMUM_SUMMARY_LENGTH, do_sample=False)
+    return get_pool().summarize([article_text], MINIMUM_SUMMARY_LENGTH, MAXIMUM_SUMMARY_LENGTH)[0]
+
+
+def summarize_batch(article_texts, priority=DEFAULT_PRIORITY):
+    # The pool pads the inputs of a batch to the longest one and runs them in a single forward pass.
+    start_time = time.monotonic()
+    summaries = get_pool().summarize(article_texts, MINIMUM_SUMMARY_LENGTH, MAXIMUM_SUMMARY_LENGTH, priority=priority)
+    tier_scheduler.record('bart', time.monotonic() - start_time, len(article_texts))
+    return summaries
+
+
+# Learns per-tier latency from every batch, used to answer cache misses within a deadline.
+tier_scheduler = TierScheduler()
+
+
+# One per priority class, shared by every consumer so articles from all categories end up in the same batches.
+# A batch never mixes classes, so interactive texts don't wait for the priority of the refresh texts around them.
+batch_summarizers = {
+    priority: BatchSummarizer(partial(summarize_batch, priority=priority),
+                              executor=ThreadPoolExecutor(max_workers=SUMMARIZER_WORKERS, thread_name_prefix=f'batch-{priority}'),
+                              max_concurrent_batches=SUMMARIZER_WORKERS)
+    for priority in PRIORITY_CLASSES
+}
+
+
+async def summarize_article_async(article_text, priority=DEFAULT_PRIORITY):
+    return await batch_summarizers[priority].summarize(article_text)
+
+
+async def summarize_with_store(data, summary_store=None, priority=DEFAULT_PRIORITY):
+    # Articles whose URL and extracted text are unchanged since a previous refresh reuse the stored summary.
+    if summary_store is not None:
+        cached = await summary_store.get(data['url'], data['text'], MINIMUM_SUMMARY_LENGTH, MAXIMUM_SUMMARY_LENGTH)
+        metrics.summary_store_total.inc(result='miss' if cached is None else 'hit')
+        if cached is not None:
+            return cached
+    # Only the most informative sentences go to the model: shorter inputs, less boilerplate.
+    summary = await summarize_article_async(condense(data['text']), priority)
+    if summary_store is not None:
+        await summary_store.put(data['url'], data['text'], MINIMUM_SUMMARY_LENGTH, MAXIMUM_SUMMARY_LENGTH, summary)
     return summary
 
 
-async def summarize_article_async(article_text):
-    async with summarize_semaphore:
-        loop = asyncio.get_running_loop()
-        summary_info = await loop.run_in_executor(executor, summarize_article, article_text)
-        summary = summary_info[0]['summary_text']
-        return summary
+async def get_summaries(ARTICLE_CONTENTS, summary_store=None, shared_summaries=None, priority=DEFAULT_PRIORITY):
+    # Submit every article at once so the batch summarizer can group them.
+    titles = list(ARTICLE_CONTENTS)
+
+    async def summarize(data):
+        return await summarize_with_store(data, summary_store, priority)
+
+    if shared_summaries is not None:
+        # The same wire story in several categories is summarized once per refresh.
+        summarized_contents = await asyncio.gather(
+            *(shared_summaries.summarize(ARTICLE_CONTENTS[title], summarize) for title in titles)
+        )
+    else:
+        summarized_contents = await asyncio.gather(*(summarize(ARTICLE_CONTENTS[title]) for title in titles))
+    return build_summaries(ARTICLE_CONTENTS, titles, summarized_contents, ['bart'] * len(titles))
 
 
-async def get_summaries(ARTICLE_CONTENTS):
+def build_summaries(ARTICLE_CONTENTS, titles, summarized_contents, tiers):
     summaries = []
-    for title, data in ARTICLE_CONTENTS.items():
-        content = data['text']
-        content = content[:1024]
-        summarized_content = await summarize_article_async(content)
+    for title, summarized_content, tier in zip(titles, summarized_contents, tiers):
+        data = ARTICLE_CONTENTS[title]
         summary = {}
         summary['title'] = title
         summary['summary'] = summarized_content
         summary['author'] = data['author']
         summary['source'] = data['source']
         summary['image'] = data['image']
+        summary['url'] = data.get('url')
+        summary['published_at'] = data.get('published_at')
+        # Which model tier produced the summary, so degraded ones can be upgraded later
+        summary['tier'] = tier
         summaries.append(summary)
     return summaries
 
 
-async def produce(name, category, timeout=40):
+async def stream_summaries(ARTICLE_CONTENTS, summary_store=None):
+    """Yield each article's summary entry as soon as its inference finishes."""
+    async def summarize_one(title):
+        summary = await summarize_with_store(ARTICLE_CONTENTS[title], summary_store, 'interactive')
+        return build_summaries(ARTICLE_CONTENTS, [title], [summary], ['bart'])[0]
+
+    for next_done in asyncio.as_completed([summarize_one(title) for title in ARTICLE_CONTENTS]):
+        yield await next_done
+
+
+async def get_summaries_within(ARTICLE_CONTENTS, deadline):
+    """Summaries that are ready by the loop time `deadline`, plus an upgrade future if they were degraded."""
+    titles = list(ARTICLE_CONTENTS)
+    texts = [condense(ARTICLE_CONTENTS[title]['text']) for title in titles]
+    summarized_contents, tiers, upgrade = await tier_scheduler.summarize(texts, MINIMUM_SUMMARY_LENGTH, MAXIMUM_SUMMARY_LENGTH, deadline)
+    return build_summaries(ARTICLE_CONTENTS, titles, summarized_contents, tiers), upgrade
+
+
+async def upgrade_summaries(ARTICLE_CONTENTS, upgrade):
+    summarized_contents, tiers = await upgrade
+    return build_summaries(ARTICLE_CONTENTS, list(ARTICLE_CONTENTS), summarized_contents, tiers)
+
+
+async def produce(name, category, queue, timeout=40):
     print(f'{name}: Starting fetch...')
     start_time = time.time()
     try:
         articles = await asyncio.wait_for(get_article_contents(category), timeout=timeout)
     except asyncio.TimeoutError:
         print(f'{name}: Timed out while fetching articles for category \'{category}\'')
-        await category_queues[category].put(None)
+        await queue.put(None)
         return
     end_time = time.time()
     current_delay = end_time - start_time
     print(f'{name}: Fetched data (Time: {current_delay:.2f}s). Producing article contents...')
-    await category_queues[category].put(articles)
+    await queue.put(articles)
     print(f'{name}: Produced article contents...')
 
 
-async def consume(name, category):
+async def consume(name, category, queue, summary_store=None, shared_summaries=None, priority=DEFAULT_PRIORITY):
     print(f'{name}: Waiting for data...')
-    article_contents = await category_queues[category].get()
+    article_contents = await queue.get()
     if article_contents is None:
         print(f'{name}: Terminating...')
-        return
+        return None
     print(f'{name}: Received article contents, summarizing articles...')
-    summaries = await get_summaries(article_contents)
-    async with lock:
-       all_summaries[category] = summaries
+    summaries = await get_summaries(article_contents, summary_store, shared_summaries, priority)
     print(f'{name}: {summaries}')
+    return summaries
 
 
-async def main():
+async def main(redis_client=None, priority=DEFAULT_PRIORITY):
+    summary_store = SummaryStore(redis_client, MODEL_NAME) if redis_client is not None else None
+    shared_summaries = SharedSummaries()
+    # Queues are created per run so they belong to the running loop and no sentinel leaks into the next refresh.
+    category_queues = {category: asyncio.Queue() for category in categories}
     producer_tasks = []
-    consumer_tasks = []
+    consumer_tasks = {}
     async with asyncio.TaskGroup() as tg:
         for producer, category in producers.items():
-            task = tg.create_task(produce(producer, category))
+            task = tg.create_task(produce(producer, category, category_queues[category]))
             producer_tasks.append(task)
         for consumer, category in consumers.items():
-            task = tg.create_task(consume(consumer, category))
-            consumer_tasks.append(task)
-    for category in categories:
-        await category_queues[category].put(None)
+            task = tg.create_task(consume(consumer, category, category_queues[category], summary_store, shared_summaries, priority))
+            consumer_tasks[category] = task
+    all_summaries = {}
+    for category, task in consumer_tasks.items():
+        if task.result() is not None:
+            all_summaries[category] = task.result()
     return all_summaries
 
 
+async def run_once():
+    try:
+        return await main()
+    finally:
+        await close_session()
+
+
 if __name__ == '__main__':
-    asyncio.run(main())
+    asyncio.run(run_once())
 
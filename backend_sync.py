@@ -1,17 +1,15 @@
 import requests
-from newspaper import Article
-from transformers import pipeline
-from transformers.utils.logging import set_verbosity_error
 from dotenv import load_dotenv
 import os
+from summarizer_pool import get_pool
+from article_fetcher import NEWS_API_URL
+from http_cache import get_article_cache
 # from langchain_huggingface import HuggingFacePipeline
 # from langchain.prompts import PromptTemplate
 
 
-set_verbosity_error()
-
-
 MAX_ENTRIES = 3
+REQUEST_TIMEOUT = 15
 MINIMUM_SUMMARY_LENGTH = 130
 MAXIMUM_SUMMARY_LENGTH = 200
 
@@ -28,9 +26,9 @@ MAXIMUM_SUMMARY_LENGTH = 200
 
 def get_article_contents(API_KEY, CATEGORY):
     if CATEGORY == 'default':
-        URL = f'https://newsapi.org/v2/top-headlines?country=us&apiKey={API_KEY}'
+        URL = f'{NEWS_API_URL}/top-headlines?country=us&apiKey={API_KEY}'
     else:
-        URL = f'https://newsapi.org/v2/top-headlines?category={CATEGORY}&apiKey={API_KEY}'
+        URL = f'{NEWS_API_URL}/top-headlines?category={CATEGORY}&apiKey={API_KEY}'
     response = requests.get(URL)
     data = response.json()
     article_contents = fetch_article_data(data)
@@ -42,6 +40,28 @@ def get_article_contents(API_KEY, CATEGORY):
     #     article_contents.update(run_data[0])
     return article_contents
 
+def download_article_text(article_url):
+    # Unchanged pages come back as a 304 and reuse the text newspaper extracted last time.
+    from newspaper import Article  # imported on first fetch, it is slow to import
+    cache = get_article_cache()
+    entry = cache.get(article_url, 'newspaper')
+    if cache.is_fresh(entry):
+        cache.record(article_url, 'fresh')
+        return entry['text']
+    response = requests.get(article_url, headers=cache.conditional_headers(entry), timeout=REQUEST_TIMEOUT)
+    if response.status_code == 304 and entry is not None:
+        cache.refresh(article_url, 'newspaper', entry, response.headers)
+        cache.record(article_url, 'revalidated')
+        return entry['text']
+    response.raise_for_status()
+    art = Article(article_url)
+    art.download(input_html=response.text)
+    art.parse()
+    stored = cache.put(article_url, 'newspaper', response.headers, art.text)
+    cache.record(article_url, 'uncacheable' if not stored else 'changed' if entry is not None else 'miss')
+    return art.text
+
+
 def fetch_article_data(DATA):
     download_successes = 0
     # download_fails = 0
@@ -55,13 +75,11 @@ def fetch_article_data(DATA):
             article_source = article['source']['name']
             article_image = article['urlToImage']
             try:
-                art = Article(article_url)
-                art.download()
-                art.parse()
+                article_text = download_article_text(article_url)
                 # content = art.text
                 # word_list = content.split()
                 # if (len(word_list) > 121):
-                article_data[article_title] = article_data[article_title] = {'text': art.text, 'author': article_author, 'source': article_source, 'image': article_image}
+                article_data[article_title] = article_data[article_title] = {'text': article_text, 'author': article_author, 'source': article_source, 'image': article_image}
                 download_successes+=1
                 # else:
                 #     download_fails+=1
@@ -76,16 +94,15 @@ def fetch_article_data(DATA):
 def summarize_article(article_text):
     # summary_chain = generate_summary_chain()
     # summary = summary_chain.invoke({'article_content': article_text})
-    summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-    summary = summarizer(article_text, max_length=MAXIMUM_SUMMARY_LENGTH, min_length=MINIMUM_SUMMARY_LENGTH, do_sample=False)
-    return summary
+    return get_pool().summarize([article_text], MINIMUM_SUMMARY_LENGTH, MAXIMUM_SUMMARY_LENGTH)[0]
 
 def get_summaries(ARTICLE_CONTENTS):
     summaries = []
-    for title, data in ARTICLE_CONTENTS.items():
-        content = data['text']
-        content = content[:1024]
-        summarized_content = summarize_article(content)[0]['summary_text']
+    titles = list(ARTICLE_CONTENTS)
+    contents = [ARTICLE_CONTENTS[title]['text'] for title in titles]
+    summarized_contents = get_pool().summarize(contents, MINIMUM_SUMMARY_LENGTH, MAXIMUM_SUMMARY_LENGTH) if contents else []
+    for title, summarized_content in zip(titles, summarized_contents):
+        data = ARTICLE_CONTENTS[title]
         summary = {}
         summary['title'] = title
         summary['summary'] = summarized_content
@@ -95,9 +112,10 @@ def get_summaries(ARTICLE_CONTENTS):
         summaries.append(summary)
     return summaries
 
-load_dotenv()
-api_key = os.getenv('NEWS_API_KEY')
-category = 'entertainment'
-articles = get_article_contents(api_key, category)
-print(get_summaries(articles))
-        
+
+if __name__ == '__main__':
+    load_dotenv()
+    api_key = os.getenv('NEWS_API_KEY')
+    category = 'entertainment'
+    articles = get_article_contents(api_key, category)
+    print(get_summaries(articles))
@@ -0,0 +1,107 @@
+import asyncio
+
+
+MAX_BATCH_SIZE = 8
+MAX_WAIT_SECONDS = 0.05
+MAX_CONCURRENT_BATCHES = 2
+
+
+class BatchSummarizer:
+    """Collects summarization requests from every consumer and runs them as padded batches.
+
+    A batch is flushed as soon as it holds max_batch_size texts or the oldest
+    pending text has waited max_wait seconds, whichever comes first. Each caller
+    gets back the summary for its own text. Up to max_concurrent_batches batches
+    run in the executor at the same time.
+    """
+
+    def __init__(self, summarize_batch, executor=None, max_batch_size=MAX_BATCH_SIZE, max_wait=MAX_WAIT_SECONDS,
+                 max_concurrent_batches=MAX_CONCURRENT_BATCHES):
+        self.summarize_batch = summarize_batch
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_concurrent_batches = max_concurrent_batches
+        self.queue = None
+        self.slots = None
+        self.worker = None
+        # Every caller's future until it is resolved, so close() can fail the ones still waiting
+        self.pending = set()
+
+    def _ensure_worker(self):
+        # The queue and worker task are created lazily so they bind to the loop that is actually running.
+        if self.worker is None or self.worker.done():
+            self.queue = asyncio.Queue()
+            self.slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self.worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def summarize(self, article_text):
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        self.pending.add(future)
+        future.add_done_callback(self.pending.discard)
+        await self.queue.put((article_text, future))
+        return await future
+
+    async def _collect_batch(self):
+        batch = [await self.queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        running = set()
+        try:
+            while True:
+                # Wait for a free slot first so texts keep accumulating into the next batch meanwhile.
+                await self.slots.acquire()
+                batch = await self._collect_batch()
+                task = loop.create_task(self._run_batch(batch))
+                running.add(task)
+                task.add_done_callback(running.discard)
+        finally:
+            for task in running:
+                task.cancel()
+            # Queued texts, the batch being collected and the cancelled batches will never be summarized.
+            for future in list(self.pending):
+                if not future.done():
+                    future.set_exception(RuntimeError('batch summarizer closed'))
+
+    async def _run_batch(self, batch):
+        try:
+            # Callers that were cancelled while waiting don't need their text summarized.
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                return
+            texts = [text for text, _ in batch]
+            loop = asyncio.get_running_loop()
+            try:
+                summaries = await loop.run_in_executor(self.executor, self.summarize_batch, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            for (_, future), summary in zip(batch, summaries):
+                if not future.done():
+                    future.set_result(summary)
+        finally:
+            self.slots.release()
+
+    async def close(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
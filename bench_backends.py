@@ -0,0 +1,92 @@
+import argparse
+import statistics
+import time
+from pathlib import Path
+from input_prep import pack_sentences
+from summarizer_backends import BACKENDS, load_backend
+
+
+SAMPLE_ARTICLES = [
+    "The city council voted on Tuesday to expand the downtown bike lane network by twelve miles over the next two years. "
+    "Supporters said the plan would make commuting safer and cut traffic on the busiest streets. "
+    "Several business owners objected, saying the loss of parking spaces would hurt their sales. "
+    "The council agreed to review parking demand after the first phase is finished. "
+    "Construction on the first segment is expected to begin in the spring.",
+    "Researchers at the university reported a new battery chemistry that keeps ninety percent of its capacity after five thousand cycles. "
+    "The cells use a sodium-based cathode, which avoids the cobalt and nickel found in most lithium-ion batteries. "
+    "The team said the design could lower the cost of grid storage, although its energy density is still below that of current electric car batteries. "
+    "A startup has licensed the technology and plans to build a pilot production line next year.",
+]
+
+
+def unigram_f1(candidate, reference):
+    candidate_words = candidate.lower().split()
+    reference_words = reference.lower().split()
+    if not candidate_words or not reference_words:
+        return 0.0
+    remaining = list(reference_words)
+    overlap = 0
+    for word in candidate_words:
+        if word in remaining:
+            remaining.remove(word)
+            overlap += 1
+    if overlap == 0:
+        return 0.0
+    precision = overlap / len(candidate_words)
+    recall = overlap / len(reference_words)
+    return 2 * precision * recall / (precision + recall)
+
+
+def bench_backend(name, model_name, articles, args):
+    start_time = time.perf_counter()
+    backend = load_backend(model_name, name)
+    load_time = time.perf_counter() - start_time
+    input_ids = [pack_sentences(article, backend.tokenizer, args.token_budget) for article in articles]
+    summaries = backend.generate(input_ids, args.min_length, args.max_length)  # warm-up, also the parity output
+    timings = []
+    for _ in range(args.runs):
+        start_time = time.perf_counter()
+        backend.generate(input_ids, args.min_length, args.max_length)
+        timings.append(time.perf_counter() - start_time)
+    return load_time, statistics.median(timings), summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare summarizer backends against the fp32 baseline.')
+    parser.add_argument('--model', default='sshleifer/distilbart-cnn-6-6', help='small model so the harness runs quickly on CPU')
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--articles', help='directory of .txt articles, defaults to two built-in samples')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--token-budget', type=int, default=1024)
+    parser.add_argument('--min-length', type=int, default=30)
+    parser.add_argument('--max-length', type=int, default=80)
+    args = parser.parse_args()
+
+    articles = SAMPLE_ARTICLES
+    if args.articles:
+        articles = [path.read_text() for path in sorted(Path(args.articles).glob('*.txt'))]
+    backend_names = args.backends.split(',')
+    if 'torch' not in backend_names:
+        backend_names.insert(0, 'torch')
+
+    results = {}
+    for name in backend_names:
+        try:
+            results[name] = bench_backend(name, args.model, articles, args)
+        except Exception as e:
+            print(f'{name:6} skipped: {e}')
+
+    if 'torch' not in results:
+        print('The fp32 torch baseline did not load, nothing to compare against')
+        return
+    baseline = results['torch']
+    print(f'{"backend":8} {"load s":>8} {"batch s":>9} {"articles/s":>11} {"speedup":>8} {"exact":>6} {"unigram F1":>11}')
+    for name, (load_time, batch_time, summaries) in results.items():
+        exact = sum(summary == reference for summary, reference in zip(summaries, baseline[2])) / len(summaries)
+        f1 = statistics.mean(unigram_f1(summary, reference) for summary, reference in zip(summaries, baseline[2]))
+        print(f'{name:8} {load_time:8.2f} {batch_time:9.3f} {len(articles) / batch_time:11.2f} '
+              f'{baseline[1] / batch_time:7.2f}x {exact:6.0%} {f1:11.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import statistics
+import time
+from pathlib import Path
+from html_extractor import CHUNK_SIZE, BeautifulSoupExtractor, StreamingExtractor
+
+
+VARIANTS = {
+    'bs4': BeautifulSoupExtractor,
+    'stream': StreamingExtractor,
+    # Same parser without the early exit, to separate parser speed from the word cutoff
+    'stream-full': lambda: StreamingExtractor(word_target=float('inf')),
+}
+
+
+def run_extractor(html, make_extractor):
+    extractor = make_extractor()
+    for start in range(0, len(html), CHUNK_SIZE):
+        if extractor.feed(html[start:start + CHUNK_SIZE]):
+            break
+    return extractor.text()
+
+
+def bench_page(html, make_extractor, runs):
+    timings = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        text = run_extractor(html, make_extractor)
+        timings.append(time.perf_counter() - start_time)
+    return statistics.median(timings), len(text.split())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare HTML extractors on saved article pages.')
+    parser.add_argument('pages', help='directory of saved .html pages')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    pages = sorted(Path(args.pages).glob('*.html'))
+    if not pages:
+        print(f'No .html pages found in {args.pages}')
+        return
+    totals = {name: 0.0 for name in VARIANTS}
+    for page in pages:
+        html = page.read_text(encoding='utf-8', errors='replace')
+        results = {name: bench_page(html, make_extractor, args.runs) for name, make_extractor in VARIANTS.items()}
+        row = '  '.join(f'{name}: {seconds * 1000:8.2f} ms {words:6d} words' for name, (seconds, words) in results.items())
+        print(f'{page.name[:40]:40}  {row}')
+        for name, (seconds, _) in results.items():
+            totals[name] += seconds
+    print()
+    baseline = totals['bs4']
+    for name, total in totals.items():
+        print(f'{name:12} total {total * 1000:9.2f} ms  ({baseline / total:.1f}x vs bs4)')
+
+
+if __name__ == '__main__':
+    main()
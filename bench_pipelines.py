@@ -0,0 +1,167 @@
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+from collections import defaultdict
+import metrics
+from news_replay import CATEGORIES, ReplayServer
+
+
+CATEGORY_TIMEOUT = 300
+PERCENTILES = (50, 90, 99)
+
+
+async def refresh_debugging(category):
+    import backend_debugging
+    with metrics.stage('fetch', category=category):
+        contents = await backend_debugging.get_article_contents(category)
+    with metrics.stage('summarize', category=category):
+        return len(await backend_debugging.get_summaries(contents))
+
+
+async def refresh_async(category):
+    import backend_async
+    with metrics.stage('fetch', category=category):
+        contents = await backend_async.get_article_contents(category)
+    with metrics.stage('summarize', category=category):
+        return len(await backend_async.get_summaries(contents))
+
+
+async def refresh_get_news_async(category):
+    import get_news_async
+    with metrics.stage('fetch', category=category):
+        contents = await get_news_async.get_article_contents(category)
+    with metrics.stage('summarize', category=category):
+        return len(await get_news_async.get_summaries(contents))
+
+
+async def refresh_sync(category):
+    import backend_sync
+    with metrics.stage('fetch', category=category):
+        contents = await asyncio.to_thread(backend_sync.get_article_contents, os.getenv('NEWS_API_KEY'), category)
+    with metrics.stage('summarize', category=category):
+        return len(await asyncio.to_thread(backend_sync.get_summaries, contents))
+
+
+# async_v2 is left out: it imports a get_news module that is no longer in the tree.
+VARIANTS = {
+    'debugging': refresh_debugging,
+    'async': refresh_async,
+    'get_news_async': refresh_get_news_async,
+    'sync': refresh_sync,
+}
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+async def run_variant(name, categories, runs):
+    """One variant in this process: every category refreshed concurrently, `runs` times. Prints a JSON result line."""
+    from summarizer_pool import get_pool, shutdown_pool
+    refresh = VARIANTS[name]
+    # Model loading is startup cost, not refresh cost, so the workers are warmed up first.
+    await get_pool().summarize_async(['Warm up the summarizer workers.'], 5, 10)
+
+    failures = []
+
+    async def refresh_category(category):
+        try:
+            return await asyncio.wait_for(refresh(category), timeout=CATEGORY_TIMEOUT)
+        except Exception as e:
+            failures.append(f'{category}: {e!r}')
+            return 0
+
+    wall_times = []
+    articles = 0
+    with metrics.collect_spans() as spans:
+        for _ in range(runs):
+            start_time = time.perf_counter()
+            articles += sum(await asyncio.gather(*(refresh_category(category) for category in categories)))
+            wall_times.append(time.perf_counter() - start_time)
+    shutdown_pool()
+    stages = defaultdict(list)
+    for span in spans:
+        stages[span['stage']].append(span['seconds'])
+    print(json.dumps({
+        'variant': name,
+        'articles': articles,
+        'seconds': sum(wall_times),
+        'runs': runs,
+        'failed_categories': len(failures),
+        'first_failure': failures[0] if failures else None,
+        # ru_maxrss is in KiB on Linux; the children are the summarizer workers, reaped by shutdown_pool()
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'worker_peak_rss_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        'stages': {stage: {f'p{q}': percentile(values, q) for q in PERCENTILES} | {'count': len(values)}
+                   for stage, values in stages.items()},
+    }))
+
+
+async def run_all(args):
+    server = ReplayServer(args.corpus, args.latency, args.jitter, args.api_latency, args.failure_rate, args.seed)
+    news_api_url = await server.start()
+    env = dict(os.environ, NEWS_API_URL=news_api_url, NEWS_API_KEY='replay', SUMMARIZER_MODEL=args.model)
+    results = []
+    try:
+        for name in args.variants.split(','):
+            # Each variant gets a fresh process, so peak RSS and caches are its own.
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, __file__, args.corpus, '--run-variant', name, '--categories', args.categories,
+                '--runs', str(args.runs), env=env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, stderr = await process.communicate()
+            lines = stdout.decode().strip().splitlines()
+            if process.returncode != 0 or not lines:
+                print(f'{name:15} skipped: {stderr.decode().strip().splitlines()[-1:] or "no output"}')
+                continue
+            results.append(json.loads(lines[-1]))
+    finally:
+        await server.stop()
+    return results
+
+
+def print_report(results):
+    print(f'{"variant":15} {"articles":>8} {"failed":>6} {"wall s":>8} {"articles/s":>10} {"RSS MB":>8} {"workers MB":>10}')
+    for result in results:
+        throughput = result['articles'] / result['seconds'] if result['seconds'] else 0.0
+        print(f"{result['variant']:15} {result['articles']:8} {result['failed_categories']:6} {result['seconds']:8.2f} {throughput:10.2f} "
+              f"{result['peak_rss_mb']:8.0f} {result['worker_peak_rss_mb']:10.0f}")
+    for result in results:
+        if result['first_failure']:
+            print(f"{result['variant']}: {result['failed_categories']} category refreshes failed, first: {result['first_failure']}")
+    print()
+    print(f'{"variant":15} {"stage":12} {"count":>6} ' + ' '.join(f'{"p" + str(q) + " s":>8}' for q in PERCENTILES))
+    for result in results:
+        for stage, summary in sorted(result['stages'].items()):
+            print(f"{result['variant']:15} {stage:12} {summary['count']:6} " + ' '.join(f"{summary[f'p{q}']:8.3f}" for q in PERCENTILES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the refresh pipelines offline against a recorded corpus.')
+    parser.add_argument('corpus', help='directory written by news_replay.py record')
+    parser.add_argument('--variants', default=','.join(VARIANTS))
+    parser.add_argument('--categories', default=','.join(CATEGORIES))
+    parser.add_argument('--model', default='sshleifer/distilbart-cnn-6-6', help='small model so the benchmark runs quickly on CPU')
+    parser.add_argument('--runs', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.05)
+    parser.add_argument('--api-latency', type=float, default=0.2)
+    parser.add_argument('--failure-rate', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--run-variant', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    categories = args.categories.split(',')
+    if args.run_variant:
+        asyncio.run(run_variant(args.run_variant, categories, args.runs))
+    else:
+        print_report(asyncio.run(run_all(args)))
+
+
+if __name__ == '__main__':
+    main()
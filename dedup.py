@@ -0,0 +1,93 @@
+import asyncio
+import re
+import zlib
+import numpy as np
+
+
+NUM_PERMUTATIONS = 64
+BANDS = 16
+SHINGLE_SIZE = 3
+DUPLICATE_THRESHOLD = 0.6
+MERSENNE_PRIME = (1 << 61) - 1
+WORD = re.compile(r'\w+')
+_random = np.random.default_rng(20240601)
+PERMUTATION_A = _random.integers(1, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+PERMUTATION_B = _random.integers(0, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def shingle_hashes(text):
+    words = WORD.findall(text.lower())
+    shingles = {' '.join(words[index:index + SHINGLE_SIZE]) for index in range(max(1, len(words) - SHINGLE_SIZE + 1))}
+    return np.array([zlib.crc32(shingle.encode()) for shingle in shingles], dtype=np.uint64)
+
+
+def minhash_signature(text):
+    hashes = shingle_hashes(text)
+    # Every permutation is applied to every shingle at once; a*h + b stays below 2**64 for 32-bit a, b and h.
+    permuted = (PERMUTATION_A[:, None] * hashes[None, :] + PERMUTATION_B[:, None]) % MERSENNE_PRIME
+    return permuted.min(axis=1)
+
+
+class NearDuplicateIndex:
+    """MinHash signatures bucketed with LSH bands.
+
+    Texts whose signatures share a band are candidates; a candidate counts as a
+    near duplicate when the estimated Jaccard similarity of their word
+    shingles is at least `threshold`.
+    """
+
+    def __init__(self, threshold=DUPLICATE_THRESHOLD, bands=BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERMUTATIONS // bands
+        self.buckets = [{} for _ in range(bands)]
+        self.signatures = {}
+
+    def band_keys(self, signature):
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def find(self, signature):
+        """Return the key of an indexed near duplicate, or None."""
+        candidates = set()
+        for band, band_key in enumerate(self.band_keys(signature)):
+            candidates.update(self.buckets[band].get(band_key, ()))
+        best_key, best_similarity = None, self.threshold
+        for key in candidates:
+            similarity = float(np.mean(self.signatures[key] == signature))
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+        return best_key
+
+    def add(self, key, signature):
+        self.signatures[key] = signature
+        for band, band_key in enumerate(self.band_keys(signature)):
+            self.buckets[band].setdefault(band_key, []).append(key)
+
+
+class SharedSummaries:
+    """Summarizes each near-duplicate cluster once per refresh and shares the result across categories."""
+
+    def __init__(self):
+        self.index = NearDuplicateIndex()
+        self.summaries = {}
+
+    async def summarize(self, data, summarize):
+        signature = minhash_signature(data['text'])
+        representative = self.index.find(signature)
+        if representative is not None:
+            try:
+                return await asyncio.shield(self.summaries[representative])
+            except Exception:
+                # The representative failed, so this copy is summarized on its own.
+                return await summarize(data)
+        future = asyncio.get_running_loop().create_future()
+        self.index.add(data['url'], signature)
+        self.summaries[data['url']] = future
+        try:
+            summary = await summarize(data)
+        except BaseException as e:
+            future.set_exception(e if isinstance(e, Exception) else RuntimeError('summarization was cancelled'))
+            future.exception()  # marks it retrieved when no duplicate is waiting
+            raise
+        future.set_result(summary)
+        return summary
@@ -10,69 +10,121 @@ interface Article {
   image: string;
   source: string;
   author: string | null;
+  tier?: string;
 }
 
 interface NewsData {
   [category: string]: Article[];
 }
 
+const categoryMap: { [key: string]: string } = {
+  'Breaking News': '',
+  'Business': 'business',
+  'Technology': 'technology',
+  'Health': 'health',
+  'Sports': 'sports',
+  'Entertainment': 'entertainment',
+  'Science': 'science'
+};
+
+const newsUrl = (category: string) => {
+  const backendCategory = categoryMap[category];
+  return backendCategory ? `${API_BASE_URL}/news/${backendCategory}` : `${API_BASE_URL}/news`;
+};
+
+const describeError = (err: any) => {
+  if (err.code === 'ECONNABORTED') {
+    return 'Request timed out. Your backend may be taking too long to process the request.';
+  } else if (err.code === 'ERR_NETWORK') {
+    return 'Cannot connect to backend. Make sure your FastAPI server is running on http://localhost:8000 and has CORS enabled.';
+  } else if (err.response) {
+    return `Server error: ${err.response.status} - ${err.response.statusText}`;
+  }
+  return 'Failed to fetch news. Please try again later.';
+};
+
 export const useNews = (category: string) => {
   const [news, setNews] = useState<NewsData>({});
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
-    const fetchNews = async () => {
-      setLoading(true);
-      setError(null);
-      
-      try {
-        let url = `${API_BASE_URL}/news`;
-        
-        const categoryMap: { [key: string]: string } = {
-          'Breaking News': '',
-          'Business': 'business',
-          'Technology': 'technology',
-          'Health': 'health',
-          'Sports': 'sports',
-          'Entertainment': 'entertainment',
-          'Science': 'science'
-        };
-
-        const backendCategory = categoryMap[category];
-        if (backendCategory) {
-          url = `${API_BASE_URL}/news/${backendCategory}`;
-        }
+    let cancelled = false;
+    let source: EventSource | null = null;
+    const url = newsUrl(category);
+
+    // With cachedOnly the server answers 204 instead of building a missing category, and we stream the build.
+    const fetchNews = async (cachedOnly: boolean) => {
+      console.log(`Fetching from: ${url}`);
 
-        console.log(`Fetching from: ${url}`);
-        
+      try {
         const response = await axios.get(url, {
           timeout: 10000,
-          headers: {
-            'Content-Type': 'application/json',
-          },
+          headers: cachedOnly ? { 'X-Cached-Only': '1' } : {},
         });
-        
+
+        if (response.status === 204) {
+          if (!cancelled) streamNews();
+          return;
+        }
         console.log('Response received:', response.data);
-        setNews(response.data);
+        if (!cancelled) setNews(response.data);
       } catch (err: any) {
         console.error('Full error details:', err);
-        
-        if (err.code === 'ECONNABORTED') {
-          setError('Request timed out. Your backend may be taking too long to process the request.');
-        } else if (err.code === 'ERR_NETWORK') {
-          setError('Cannot connect to backend. Make sure your FastAPI server is running on http://localhost:8000 and has CORS enabled.');
-        } else if (err.response) {
-          setError(`Server error: ${err.response.status} - ${err.response.statusText}`);
-        } else {
-          setError('Failed to fetch news. Please try again later.');
-        }
-      } finally {
-        setLoading(false);
+        if (!cancelled) setError(describeError(err));
       }
+      if (!cancelled) setLoading(false);
     };
 
-    fetchNews();
+    // A category that is not cached yet fills in one article at a time as summaries finish, then the published
+    // payload replaces them, and again once model summaries replace quick ones.
+    const streamNews = () => {
+      const streamUrl = `${url}/stream`;
+      console.log(`Streaming from: ${streamUrl}`);
+      source = new EventSource(streamUrl);
+      let categoryKey = category;
+      let received = false;
+
+      source.addEventListener('start', (event) => {
+        categoryKey = JSON.parse((event as MessageEvent).data).category;
+      });
+
+      source.addEventListener('article', (event) => {
+        const article: Article = JSON.parse((event as MessageEvent).data);
+        received = true;
+        setNews((current) => ({ [categoryKey]: [...(current[categoryKey] ?? []), article] }));
+        setLoading(false);
+      });
+
+      source.addEventListener('payload', (event) => {
+        received = true;
+        setNews(JSON.parse((event as MessageEvent).data));
+        setLoading(false);
+      });
+
+      source.addEventListener('done', () => {
+        source?.close();
+        setLoading(false);
+      });
+
+      source.onerror = () => {
+        source?.close();
+        // Without any article yet, fall back to waiting on the plain JSON endpoint.
+        if (!cancelled && !received) fetchNews(false);
+        else setLoading(false);
+      };
+    };
+
+    setLoading(true);
+    setError(null);
+    setNews({});
+    // Cached reads go through the JSON endpoint so they get ETag revalidation and compression.
+    fetchNews(typeof EventSource !== 'undefined');
+
+    return () => {
+      cancelled = true;
+      source?.close();
+    };
   }, [category]);
 
   return { news, loading, error };
@@ -2,8 +2,8 @@ import aiohttp
 import asyncio
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from transformers import pipeline
-from concurrent.futures import ThreadPoolExecutor
+from article_fetcher import NEWS_API_URL
+from summarizer_pool import get_pool
 import os
 
 
@@ -14,9 +14,9 @@ MAX_ENTRIES = 3
 
 async def get_article_contents(category):
     if category == 'default':
-        url = f'https://newsapi.org/v2/top-headlines?country=us&apiKey={api_key}'
+        url = f'{NEWS_API_URL}/top-headlines?country=us&apiKey={api_key}'
     else:
-        url = f'https://newsapi.org/v2/top-headlines?category={category}&apiKey={api_key}'
+        url = f'{NEWS_API_URL}/top-headlines?category={category}&apiKey={api_key}'
     async with aiohttp.ClientSession() as session:
         async with session.get(url) as response:
             data = await response.json()
@@ -54,28 +54,18 @@ async def fetch_article_data(DATA, FIRST_ARTICLE_INDEX, LAST_ARTICLE_INDEX):
     return [article_data, download_successes, download_fails]
 
 
-summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-executor = ThreadPoolExecutor(max_workers=2)
-summarize_semaphore = asyncio.Semaphore(2)
-
-
 def summarize_article(article_text):
-    summary = summarizer(article_text, max_length=130, min_length=30, do_sample=False)
-    return summary
+    return get_pool().summarize([article_text], 30, 130)[0]
 
 
 async def summarize_article_async(article_text):
-    async with summarize_semaphore:
-        loop = asyncio.get_running_loop()
-        summary_info = await loop.run_in_executor(executor, summarize_article, article_text)
-        summary = summary_info[0]['summary_text']
-        return summary
+    summaries = await get_pool().summarize_async([article_text], 30, 130)
+    return summaries[0]
 
 
 async def get_summaries(ARTICLE_CONTENTS):
     summaries = {}
     for title, content in ARTICLE_CONTENTS.items():
-        content = content[:1024]
         summarized_content = await summarize_article_async(content)
         summaries[title] = summarized_content
     return summaries
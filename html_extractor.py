@@ -0,0 +1,140 @@
+import asyncio
+import codecs
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+
+
+EXTRACTOR = os.getenv('EXTRACTOR', 'stream')
+EXTRACT_WORD_TARGET = int(os.getenv('EXTRACT_WORD_TARGET', '1000'))
+EXTRACT_WORKERS = int(os.getenv('EXTRACT_WORKERS', '4'))
+CHUNK_SIZE = 64 * 1024
+SKIPPED_TAGS = {'script', 'style', 'noscript', 'template'}
+executor = ThreadPoolExecutor(max_workers=EXTRACT_WORKERS, thread_name_prefix='extract')
+
+
+class ParagraphParser(HTMLParser):
+    """Incremental parser that keeps the text inside <p> tags, like find_all('p') does."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs = []
+        self.current = []
+        self.paragraph_depth = 0
+        self.skip_depth = 0
+        self.word_count = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'p':
+            # <p> can't nest: as in browsers, a new one closes any paragraph left open.
+            self.end_paragraph()
+            self.current = []
+            self.paragraph_depth = 1
+        elif tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag == 'p':
+            self.end_paragraph()
+        elif tag in SKIPPED_TAGS and self.skip_depth > 0:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        if self.paragraph_depth > 0 and self.skip_depth == 0:
+            self.current.append(data)
+
+    def end_paragraph(self):
+        if self.paragraph_depth == 0:
+            return
+        self.paragraph_depth = 0
+        paragraph = ''.join(self.current)
+        self.paragraphs.append(paragraph)
+        self.word_count += len(paragraph.split())
+
+    def close(self):
+        super().close()
+        self.end_paragraph()
+
+
+class StreamingExtractor:
+    """Parses the page chunk by chunk and stops once it has word_target words of paragraph text."""
+
+    def __init__(self, word_target=EXTRACT_WORD_TARGET):
+        self.word_target = word_target
+        self.parser = ParagraphParser()
+
+    def feed(self, chunk):
+        self.parser.feed(chunk)
+        return self.parser.word_count >= self.word_target
+
+    def text(self):
+        self.parser.close()
+        return ' '.join(self.parser.paragraphs)
+
+
+class BeautifulSoupExtractor:
+    """The original extraction path: buffer the whole page, then find_all('p') with BeautifulSoup."""
+
+    def __init__(self, word_target=EXTRACT_WORD_TARGET):
+        self.chunks = []
+
+    def feed(self, chunk):
+        self.chunks.append(chunk)
+        return False
+
+    def text(self):
+        from bs4 import BeautifulSoup
+        parsed = BeautifulSoup(''.join(self.chunks), 'html.parser')
+        paragraphs = parsed.find_all('p')
+        return ' '.join(p.text for p in paragraphs)
+
+
+EXTRACTORS = {
+    'stream': StreamingExtractor,
+    'bs4': BeautifulSoupExtractor,
+}
+
+
+def make_decoder(charset):
+    try:
+        return codecs.getincrementaldecoder(charset or 'utf-8')(errors='replace')
+    except LookupError:
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+
+def make_extractor(name=None):
+    return EXTRACTORS[name or EXTRACTOR]()
+
+
+async def extract_response(response, name=None, timings=None):
+    """Extract paragraph text from an aiohttp response as it streams in.
+
+    Parsing runs in the extraction thread pool so large pages don't stall the
+    event loop, and the rest of the body is not read once the extractor has
+    enough words. If a `timings` dict is given, the seconds spent parsing are
+    added to its 'extract' entry.
+    """
+    loop = asyncio.get_running_loop()
+    extractor = make_extractor(name)
+    decoder = make_decoder(response.charset)
+    parse_seconds = 0.0
+
+    async def parse(*args):
+        nonlocal parse_seconds
+        start_time = time.perf_counter()
+        try:
+            return await loop.run_in_executor(executor, *args)
+        finally:
+            parse_seconds += time.perf_counter() - start_time
+
+    try:
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            if await parse(extractor.feed, decoder.decode(chunk)):
+                break
+        else:
+            await parse(extractor.feed, decoder.decode(b'', final=True))
+        return await parse(extractor.text)
+    finally:
+        if timings is not None:
+            timings['extract'] = timings.get('extract', 0.0) + parse_seconds
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlparse
+import metrics
+
+
+ARTICLE_CACHE_DIR = os.getenv('ARTICLE_CACHE_DIR', '.article_cache')
+ARTICLE_CACHE_MAX_BYTES = int(os.getenv('ARTICLE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+# Eviction goes a little below the cap so it doesn't run again on the very next write
+EVICT_TO = 0.9
+MAX_AGE = re.compile(r'max-age=(\d+)')
+_article_cache = None
+_article_cache_lock = threading.Lock()
+
+
+def cache_lifetime(headers):
+    """Seconds the response may be reused without revalidating, or None if it must not be stored"""
+    cache_control = headers.get('Cache-Control', '').lower()
+    if 'no-store' in cache_control:
+        return None
+    if 'no-cache' in cache_control:
+        return 0
+    match = MAX_AGE.search(cache_control)
+    return int(match.group(1)) if match else 0
+
+
+class ArticleCache:
+    """Disk cache of extracted article text, revalidated with conditional GETs.
+
+    Each entry keeps the text one extractor got from a URL along with the
+    response's ETag and Last-Modified. While a Cache-Control max-age holds
+    the text is reused without a request; after that the fetcher sends
+    If-None-Match / If-Modified-Since and a 304 reuses the text, skipping
+    both the transfer and the parse. Files are touched on every hit and the
+    least recently used ones are deleted once the directory passes max_bytes.
+    """
+
+    def __init__(self, directory=ARTICLE_CACHE_DIR, max_bytes=ARTICLE_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.total_bytes = None
+        self.host_stats = defaultdict(lambda: defaultdict(int))
+
+    def path(self, url, extractor):
+        key = f'{extractor} {url}'.encode()
+        return self.directory / f'{hashlib.sha1(key).hexdigest()}.json'
+
+    def get(self, url, extractor):
+        path = self.path(url, extractor)
+        try:
+            entry = json.loads(path.read_text())
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def is_fresh(self, entry):
+        return entry is not None and time.time() < entry.get('fresh_until', 0)
+
+    def put(self, url, extractor, headers, text):
+        """Store the text of a 200 response that can be revalidated or reused; returns whether it was stored"""
+        lifetime = cache_lifetime(headers)
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if lifetime is None or not (etag or last_modified or lifetime):
+            return False
+        entry = {'url': url, 'etag': etag, 'last_modified': last_modified, 'fresh_until': time.time() + lifetime, 'text': text}
+        self.write(self.path(url, extractor), json.dumps(entry).encode())
+        return True
+
+    def refresh(self, url, extractor, entry, headers):
+        """A 304 can carry a new lifetime and validators, keep them"""
+        lifetime = cache_lifetime(headers)
+        if lifetime is None:
+            return
+        entry = dict(entry, fresh_until=time.time() + lifetime)
+        entry['etag'] = headers.get('ETag') or entry.get('etag')
+        entry['last_modified'] = headers.get('Last-Modified') or entry.get('last_modified')
+        self.write(self.path(url, extractor), json.dumps(entry).encode())
+
+    def write(self, path, data):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        temporary_path.write_bytes(data)
+        try:
+            replaced_bytes = path.stat().st_size
+        except FileNotFoundError:
+            replaced_bytes = 0
+        os.replace(temporary_path, path)
+        with self.lock:
+            if self.total_bytes is None:
+                self.total_bytes = sum(size for _, size, _ in self.scan())
+            else:
+                # Revalidations rewrite existing entries, which must not count twice
+                self.total_bytes += len(data) - replaced_bytes
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+
+    def scan(self):
+        entries = []
+        for path in self.directory.glob('*.json'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # evicted by another worker
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        # Rescanned each time, since other worker processes share the directory.
+        entries = sorted(self.scan())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes * EVICT_TO:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+        self.total_bytes = total
+
+    def record(self, url, result):
+        """Count one lookup: 'fresh' and 'revalidated' are hits; 'changed', 'miss' and 'uncacheable' downloaded the page"""
+        host = urlparse(url).hostname or ''
+        with self.lock:
+            self.host_stats[host][result] += 1
+        metrics.article_cache_total.inc(host=host, result=result)
+
+    def stats(self):
+        """Per-host lookup counts and the share answered without a full download"""
+        with self.lock:
+            stats = {}
+            for host, counts in self.host_stats.items():
+                total = sum(counts.values())
+                stats[host] = dict(counts, lookups=total,
+                                   hit_rate=(counts['fresh'] + counts['revalidated']) / total if total else 0.0)
+            return stats
+
+
+def get_article_cache():
+    global _article_cache
+    with _article_cache_lock:
+        if _article_cache is None:
+            _article_cache = ArticleCache()
+        return _article_cache
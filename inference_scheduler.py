@@ -0,0 +1,93 @@
+import itertools
+import os
+import threading
+import time
+
+
+# Lower rank is served first
+PRIORITY_CLASSES = ['interactive', 'refresh', 'backfill']
+DEFAULT_PRIORITY = 'refresh'
+# A waiter's place in line moves up one class for every AGING_SECONDS it has waited
+AGING_SECONDS = float(os.getenv('INFERENCE_AGING_SECONDS', '30'))
+# Slots only interactive work may use, so a user never waits for background batches to drain
+INTERACTIVE_RESERVED_SLOTS = int(os.getenv('INFERENCE_INTERACTIVE_RESERVED', '1'))
+
+
+class ClassStats:
+    def __init__(self):
+        self.depth = 0
+        self.max_depth = 0
+        self.admitted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def as_dict(self):
+        return {
+            'depth': self.depth,
+            'max_depth': self.max_depth,
+            'admitted': self.admitted,
+            'mean_wait': self.total_wait / self.admitted if self.admitted else 0.0,
+            'max_wait': self.max_wait,
+        }
+
+
+class PriorityScheduler:
+    """Admits inference batches to the workers by priority class instead of arrival order.
+
+    At most `capacity` batches run at once, plus `reserved` more that only
+    interactive work may take; capacity + reserved should not exceed the
+    workers, or reserved batches just queue behind running ones. Waiters are
+    ordered by arrival time plus rank * aging seconds, so background work is
+    deferred by interactive work but never starved: a refresh batch that has
+    waited `aging` seconds ranks like an interactive one that just arrived.
+    """
+
+    def __init__(self, capacity, reserved=INTERACTIVE_RESERVED_SLOTS, aging=AGING_SECONDS):
+        self.capacity = capacity
+        self.reserved = reserved
+        self.aging = aging
+        self.in_flight = 0
+        self.waiting = []
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.class_stats = {priority: ClassStats() for priority in PRIORITY_CLASSES}
+
+    def _limit(self, priority):
+        return self.capacity + self.reserved if priority == 'interactive' else self.capacity
+
+    def _next_waiter(self):
+        admissible = [waiter for waiter in self.waiting if self.in_flight < self._limit(waiter[2])]
+        return min(admissible, default=None)
+
+    def acquire(self, priority=DEFAULT_PRIORITY):
+        if priority not in self.class_stats:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {', '.join(PRIORITY_CLASSES)}")
+        stats = self.class_stats[priority]
+        enqueued = time.monotonic()
+        waiter = (enqueued + PRIORITY_CLASSES.index(priority) * self.aging, next(self.sequence), priority)
+        with self.condition:
+            self.waiting.append(waiter)
+            stats.depth += 1
+            stats.max_depth = max(stats.max_depth, stats.depth)
+            try:
+                while self._next_waiter() != waiter:
+                    self.condition.wait()
+            finally:
+                self.waiting.remove(waiter)
+                stats.depth -= 1
+            self.in_flight += 1
+            waited = time.monotonic() - enqueued
+            stats.admitted += 1
+            stats.total_wait += waited
+            stats.max_wait = max(stats.max_wait, waited)
+            # Several slots may have freed up before anyone woke, so let the next waiter check too.
+            self.condition.notify_all()
+
+    def release(self):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def stats(self):
+        with self.condition:
+            return {priority: stats.as_dict() for priority, stats in self.class_stats.items()}
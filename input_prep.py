@@ -0,0 +1,77 @@
+import re
+import weakref
+
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+# Keyed weakly so a collected tokenizer's id cannot hand its template to a new one
+_special_token_templates = weakref.WeakKeyDictionary()
+
+
+def split_sentences(text):
+    sentences = [sentence for sentence in SENTENCE_BOUNDARY.split(text.strip()) if sentence]
+    # BART's byte-level BPE encodes a word differently with and without its leading space, so keep it.
+    return [sentence if index == 0 else ' ' + sentence for index, sentence in enumerate(sentences)]
+
+
+def add_special_tokens(token_ids, tokenizer):
+    """Wrap token IDs in the tokenizer's special tokens (<s> ... </s> for BART).
+
+    Not every tokenizer class has build_inputs_with_special_tokens, so the
+    prefix and suffix are learned once by encoding a single word both ways.
+    """
+    template = _special_token_templates.get(tokenizer)
+    if template is None:
+        plain = tokenizer('a', add_special_tokens=False)['input_ids']
+        full = tokenizer('a')['input_ids']
+        template = ([], [])
+        for start in range(len(full) - len(plain) + 1):
+            if full[start:start + len(plain)] == plain:
+                template = (full[:start], full[start + len(plain):])
+                break
+        _special_token_templates[tokenizer] = template
+    prefix, suffix = template
+    return prefix + list(token_ids) + suffix
+
+
+def encode_sentences(text, tokenizer):
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+    return tokenizer(sentences, add_special_tokens=False)['input_ids']
+
+
+def pack_encoded(encoded_sentences, tokenizer, budget):
+    """Pack whole sentences into one model input of at most `budget` tokens, special tokens included."""
+    body_budget = budget - tokenizer.num_special_tokens_to_add()
+    token_ids = []
+    for sentence_ids in encoded_sentences:
+        if len(token_ids) + len(sentence_ids) > body_budget:
+            break
+        token_ids.extend(sentence_ids)
+    if not token_ids and encoded_sentences:
+        # A first sentence longer than the whole budget is the only case that gets cut mid-sentence.
+        token_ids = encoded_sentences[0][:body_budget]
+    return add_special_tokens(token_ids, tokenizer)
+
+
+def pack_sentences(text, tokenizer, budget):
+    return pack_encoded(encode_sentences(text, tokenizer), tokenizer, budget)
+
+
+def chunk_sentences(text, tokenizer, budget, max_chunks):
+    """Split a long article into up to max_chunks inputs of whole sentences, each within `budget` tokens."""
+    encoded_sentences = encode_sentences(text, tokenizer)
+    body_budget = budget - tokenizer.num_special_tokens_to_add()
+    chunks = []
+    start = 0
+    while start < len(encoded_sentences) and len(chunks) < max_chunks:
+        used = 0
+        end = start
+        while end < len(encoded_sentences) and used + len(encoded_sentences[end]) <= body_budget:
+            used += len(encoded_sentences[end])
+            end += 1
+        if end == start:
+            end = start + 1
+        chunks.append(pack_encoded(encoded_sentences[start:end], tokenizer, budget))
+        start = end
+    return chunks or [add_special_tokens([], tokenizer)]
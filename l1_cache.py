@@ -0,0 +1,77 @@
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+
+L1_MAX_ENTRIES = 64
+L1_TTL = 300
+INVALIDATION_CHANNEL = 'news:invalidate'
+
+
+class L1Cache:
+    """Per-worker LRU cache with a TTL, sitting in front of Redis.
+
+    clear() bumps the version, and set() ignores values read under an older
+    version, so a read that raced with an invalidation cannot put stale data
+    back into the cache.
+    """
+
+    def __init__(self, max_entries=L1_MAX_ENTRIES, ttl=L1_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.version = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key, value, version):
+        if version != self.version:
+            return
+        self.entries[key] = (value, time.monotonic() + self.ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        self.version += 1
+        if key is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(key, None)
+
+
+async def publish_invalidation(redis_client, key=None):
+    await redis_client.publish(INVALIDATION_CHANNEL, key or '*')
+
+
+async def listen_for_invalidations(redis_client, cache, retry_delay=1):
+    """Clear this worker's L1 cache whenever any worker publishes new data."""
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Anything published while we were not subscribed is lost, so start from empty.
+                cache.invalidate()
+                async for message in pubsub.listen():
+                    if message['type'] != 'message':
+                        continue
+                    key = message['data']
+                    if isinstance(key, bytes):
+                        key = key.decode()
+                    cache.invalidate(None if key == '*' else key)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[{datetime.now()}] L1 invalidation listener error: {e}")
+            cache.invalidate()
+            await asyncio.sleep(retry_delay)
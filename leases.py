@@ -0,0 +1,124 @@
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime
+
+
+LEASE_TTL_MS = int(os.getenv('LEASE_TTL_MS', '30000'))
+# Renewing three times per TTL leaves room for a slow round trip or two before the lease lapses
+RENEW_INTERVAL = LEASE_TTL_MS / 3000
+# Unique per process, so two workers on the same host never mistake each other's leases for their own
+WORKER_ID = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+# Every successful acquire gets a new, strictly increasing fencing token
+ACQUIRE_SCRIPT = """
+if not redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return false
+end
+return redis.call('INCR', KEYS[2])
+"""
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaseLost(Exception):
+    """A write was fenced off because its lease has since been taken over by another worker."""
+
+
+def lease_key(name):
+    return f'lease:{name}'
+
+
+def fencing_key(name):
+    return f'lease:{name}:token'
+
+
+class Lease:
+    """A Redis lease on `name` that expires unless its owner keeps renewing it.
+
+    Only the owner's value can renew or release it. `token` is the fencing
+    token of the current term; writers hand it to the store, which rejects
+    it once a newer term has started, so a worker that stalled past its TTL
+    can't overwrite the new owner's results.
+    """
+
+    def __init__(self, redis_client, name, owner=WORKER_ID, ttl_ms=LEASE_TTL_MS):
+        self.name = name
+        self.owner = owner
+        self.ttl_ms = ttl_ms
+        self.token = None
+        self.acquire_script = redis_client.register_script(ACQUIRE_SCRIPT)
+        self.renew_script = redis_client.register_script(RENEW_SCRIPT)
+        self.release_script = redis_client.register_script(RELEASE_SCRIPT)
+
+    @property
+    def held(self):
+        return self.token is not None
+
+    async def acquire(self):
+        token = await self.acquire_script(keys=[lease_key(self.name), fencing_key(self.name)], args=[self.owner, self.ttl_ms])
+        self.token = int(token) if token else None
+        return self.held
+
+    async def renew(self):
+        if not await self.renew_script(keys=[lease_key(self.name)], args=[self.owner, self.ttl_ms]):
+            self.token = None
+        return self.held
+
+    async def release(self):
+        if self.held:
+            self.token = None
+            await self.release_script(keys=[lease_key(self.name)], args=[self.owner])
+
+    def fence(self):
+        """(key, token) for SnapshotStore.publish, or None when not the owner"""
+        return (fencing_key(self.name), self.token) if self.held else None
+
+
+class LeaseKeeper:
+    """Keeps one lease per name: renews the ones this worker owns and tries to take over the rest.
+
+    When an owner dies its leases lapse after LEASE_TTL_MS and the next
+    worker to try picks them up.
+    """
+
+    def __init__(self, redis_client, names, owner=WORKER_ID, ttl_ms=LEASE_TTL_MS):
+        self.leases = {name: Lease(redis_client, name, owner, ttl_ms) for name in names}
+
+    def owned(self):
+        return [name for name, lease in self.leases.items() if lease.held]
+
+    def fence(self, name):
+        return self.leases[name].fence()
+
+    async def maintain_once(self, on_acquired=None):
+        for name, lease in self.leases.items():
+            if lease.held:
+                if not await lease.renew():
+                    print(f"[{datetime.now()}] Lost the lease on {name}, another worker now refreshes it")
+            elif await lease.acquire():
+                print(f"[{datetime.now()}] Acquired the lease on {name} (token {lease.token})")
+                if on_acquired is not None:
+                    on_acquired(name)
+
+    async def run(self, on_acquired=None):
+        while True:
+            try:
+                await self.maintain_once(on_acquired)
+            except Exception as e:
+                print(f"[{datetime.now()}] Lease maintenance failed: {e!r}")
+            await asyncio.sleep(RENEW_INTERVAL)
+
+    async def release_all(self):
+        for lease in self.leases.values():
+            await lease.release()
@@ -1,42 +1,415 @@
+import startup_profile
+startup_profile.install()  # STARTUP_PROFILE=1 reports import and init time per module
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import redis.asyncio as redis
 import httpx
+import asyncio
 import json
 import os
+import time
+import metrics
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from datetime import datetime
-from backend_debugging import main
-from backend_sync import get_article_contents, get_summaries
+from datetime import datetime, timedelta
+from backend_debugging import (categories, fetch_article_data, get_article_contents, get_article_list, get_summaries,
+                               get_summaries_within, stream_summaries, upgrade_summaries)
+from article_fetcher import close_session
+from http_cache import get_article_cache
+from summarizer_pool import MODEL_NAME, inference_stats, shutdown_pool
+from single_flight import BuildProgress, SingleFlight
+from dedup import SharedSummaries
+from news_payloads import choose_encoding, encode_payload, etag_matches, payload_age
+from news_snapshots import SnapshotStore, load_local_snapshot, save_local_snapshot
+from l1_cache import L1Cache, listen_for_invalidations, publish_invalidation
+from summary_store import SummaryStore
+from refresh_planner import RefreshPlanner
+from leases import LeaseKeeper, LeaseLost
+from article_store import ARTICLE_FIELDS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ArticleStore
+from search_index import DEFAULT_RESULTS, MAX_RESULTS, SearchIndex, follow_publishes
 
 load_dotenv()
-API_KEY = os.getenv('NEWS_API_KEY')
+HEADLINES_KEY = 'Today\'s Top Headlines'
+SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', 'news_snapshot.json')
+STALE_AFTER = int(os.getenv('STALE_AFTER', '7200'))
+# Cache misses must answer before the frontend's 10 second timeout
+CACHE_MISS_DEADLINE = float(os.getenv('CACHE_MISS_DEADLINE', '8'))
+REFRESH_FETCH_TIMEOUT = 40
+# Hosts with the most article lookups, logged with their cache hit rate after each full refresh
+ARTICLE_CACHE_LOG_HOSTS = 5
 
 # Initialize scheduler globally
 scheduler = AsyncIOScheduler()
+# Concurrent cache misses for the same category share one fetch-and-summarize build
+cache_miss_builds = SingleFlight()
+# Per-worker copy of the hot payloads, invalidated over Redis pub/sub whenever a refresh publishes
+l1_cache = L1Cache()
+# Fire-and-forget tasks such as summary upgrades; the loop only keeps weak references to tasks
+background_tasks = set()
+# Category -> its running publish_upgrade task, so streams can wait for the model's summaries
+pending_upgrades = {}
+# Category -> articles of its streamed cache-miss build so far, replayed to every stream that joins the build
+article_streams = {}
+# Categories this worker is building right now, so a timer doesn't rebuild one the full refresh is on
+building = set()
+# Per-worker full-text index over every published article, kept current over the same pub/sub channel
+search_index = SearchIndex()
+# Per-category refresh timers, staggered across the hour and adapted to how often each category changes
+refresh_planner = RefreshPlanner(categories)
 
-async def refresh_all_news_cache(redis_client):
+
+def cache_key_for(category):
+    return HEADLINES_KEY if category == 'default' else category
+
+
+def run_in_background(coroutine):
+    task = asyncio.create_task(coroutine)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+
+def category_for(cache_key):
+    return 'default' if cache_key == HEADLINES_KEY else cache_key
+
+
+def refresh_job_id(category):
+    return f'news_refresh_{category}'
+
+
+def seconds_until_category_refresh(category):
+    """Client cache lifetime: time left until the category's next scheduled check"""
+    job = scheduler.get_job(refresh_job_id(category))
+    if job is None or job.next_run_time is None:
+        # No timer yet (e.g. during startup), so assume the soonest check the planner could schedule
+        return refresh_planner.min_interval
+    return max(0, int((job.next_run_time - datetime.now(job.next_run_time.tzinfo)).total_seconds()))
+
+
+async def fill_cache_miss(redis_raw, category):
+    """Build a missing category within CACHE_MISS_DEADLINE and cache it, once per category"""
+    async def build():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + CACHE_MISS_DEADLINE
+        try:
+            articles = await asyncio.wait_for(get_article_contents(category), timeout=CACHE_MISS_DEADLINE)
+        except asyncio.TimeoutError:
+            print(f"[{datetime.now()}] Fetching {category} did not finish within the cache-miss deadline")
+            articles = {}
+        summarized_articles, upgrade = await get_summaries_within(articles, deadline)
+        payload = await publish_category(redis_raw, category, summarized_articles)
+        if upgrade is not None:
+            task = run_in_background(publish_upgrade(redis_raw, category, articles, upgrade))
+            pending_upgrades[category] = task
+
+            def forget(_):
+                if pending_upgrades.get(category) is task:
+                    del pending_upgrades[category]
+
+            task.add_done_callback(forget)
+        return payload
+
+    return await cache_miss_builds.do(category, build)
+
+
+def start_streamed_build(redis_raw, category):
+    """Start or join the category's cache-miss build, summarizing article by article at interactive priority.
+
+    Returns (task, progress). progress follows the articles as they finish; it
+    is None when the stream joined a deadline build from fill_cache_miss. A
+    plain request that misses while a streamed build runs waits for it too.
+    """
+    def build():
+        progress = BuildProgress()
+        article_streams[category] = progress
+        return stream_build(redis_raw, category, progress)
+
+    task = cache_miss_builds.start(category, build)
+    return task, article_streams.get(category)
+
+
+async def stream_build(redis_raw, category, progress):
+    try:
+        try:
+            articles = await asyncio.wait_for(get_article_contents(category), timeout=CACHE_MISS_DEADLINE)
+        except asyncio.TimeoutError:
+            print(f"[{datetime.now()}] Fetching {category} did not finish within the cache-miss deadline")
+            articles = {}
+        summary_store = SummaryStore(app.state.redis, MODEL_NAME)
+        summarized_articles = {}
+        async for summary in stream_summaries(articles, summary_store):
+            summarized_articles[summary['title']] = summary
+            progress.append(summary)
+        # The published payload keeps the listing order rather than completion order
+        return await publish_category(redis_raw, category, [summarized_articles[title] for title in articles])
+    finally:
+        progress.finish()
+        if article_streams.get(category) is progress:
+            del article_streams[category]
+
+
+async def publish_category(redis_raw, category, summarized_articles, fences=()):
+    """Publish a single category on top of the current snapshot"""
+    cache_key = cache_key_for(category)
+    payload = encode_payload({cache_key: summarized_articles})
+    if summarized_articles:
+        with metrics.stage('publish', category=category):
+            await app.state.snapshots.publish({cache_key: payload}, fences)
+            await app.state.articles.index(category, summarized_articles)
+        search_index.index(category, summarized_articles)
+        await publish_invalidation(redis_raw, cache_key)
+        await persist_local_snapshot()
+    return payload
+
+
+async def publish_upgrade(redis_raw, category, articles, upgrade):
+    """Replace extractive fallback summaries with the model's once it finishes"""
+    try:
+        summarized_articles = await upgrade_summaries(articles, upgrade)
+        payload = await publish_category(redis_raw, category, summarized_articles)
+        print(f"[{datetime.now()}] Upgraded {category} to model summaries")
+        return payload
+    except Exception as e:
+        print(f"[{datetime.now()}] Could not upgrade {category}: {e}")
+        return None
+
+
+async def cache_all_summaries(redis_raw, all_summaries, fences=()):
+    """Publish every category as ready-to-send response bytes in one new snapshot generation"""
+    payloads = {}
+    for category, summaries in all_summaries.items():
+        cache_key = cache_key_for(category)
+        # Empty categories keep the payload from the previous generation
+        payloads[cache_key] = encode_payload({cache_key: summaries}) if summaries else None
+    with metrics.stage('publish', category='all'):
+        generation = await app.state.snapshots.publish(payloads, fences)
+        for category, summaries in all_summaries.items():
+            await app.state.articles.index(category, summaries)
+    for category, summaries in all_summaries.items():
+        search_index.index(category, summaries)
+    if generation is not None:
+        print(f"[{datetime.now()}] Published snapshot generation {generation}: {', '.join(payloads)}")
+        await publish_invalidation(redis_raw)
+        await persist_local_snapshot()
+
+
+async def sync_search_index(cache_key=None):
+    """Index what any worker published; articles already indexed unchanged are skipped"""
+    if cache_key is None:
+        payloads = await app.state.snapshots.load_all()
+    else:
+        payload = await app.state.snapshots.load(cache_key)
+        payloads = {cache_key: payload} if payload is not None else {}
+    for key, payload in payloads.items():
+        search_index.index(category_for(key), json.loads(payload['identity']).get(key))
+
+
+async def persist_local_snapshot():
+    """Mirror the current snapshot to disk for warm starts"""
+    try:
+        payloads = await app.state.snapshots.load_all()
+        await asyncio.to_thread(save_local_snapshot, SNAPSHOT_PATH, payloads)
+    except Exception as e:
+        print(f"[{datetime.now()}] Could not write local snapshot: {e}")
+
+
+async def warm_start(snapshots):
+    """Make sure there is something to serve before the first refresh finishes"""
+    generation = await snapshots.current_generation()
+    if generation is not None:
+        print(f"[{datetime.now()}] Serving snapshot generation {generation} from Redis until the first refresh")
+        return True
+    payloads = await asyncio.to_thread(load_local_snapshot, SNAPSHOT_PATH)
+    if payloads:
+        generation = await snapshots.publish(payloads)
+        print(f"[{datetime.now()}] Restored snapshot generation {generation} from {SNAPSHOT_PATH}")
+        return True
+    print(f"[{datetime.now()}] No previous snapshot, requests will build categories on demand")
+    return False
+
+
+async def get_cached_payload(cache_key):
+    """Read a payload from the in-process cache, falling back to Redis"""
+    payload = l1_cache.get(cache_key)
+    if payload is not None:
+        metrics.cache_lookups_total.inc(layer='l1')
+        return payload
+    version = l1_cache.version
+    payload = await app.state.snapshots.load(cache_key)
+    if payload is not None:
+        l1_cache.set(cache_key, payload, version)
+    metrics.cache_lookups_total.inc(layer='redis' if payload is not None else 'miss')
+    return payload
+
+
+def payload_response(request, payload, category='default'):
+    """Send stored payload bytes as-is, or a 304 if the client already has them"""
+    etag = payload['etag'].decode()
+    headers = {
+        'ETag': etag,
+        'Cache-Control': f'public, max-age={seconds_until_category_refresh(category)}',
+        'Vary': 'Accept-Encoding',
+        'X-Data-Age': str(payload_age(payload)),
+    }
+    if etag_matches(request.headers.get('if-none-match', ''), etag):
+        return Response(status_code=304, headers=headers)
+    encoding = choose_encoding(request.headers.get('accept-encoding', ''), payload)
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return Response(content=payload[encoding], media_type='application/json', headers=headers)
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def payload_event(payload):
+    # Compact JSON has no raw newlines, so the stored bytes fit in a single data line as they are
+    return b'event: payload\ndata: ' + payload['identity'] + b'\n\n'
+
+
+def not_cached_response():
+    """What a client that sent X-Cached-Only gets on a miss: it opens the stream instead of waiting here"""
+    return Response(status_code=204, headers={'Cache-Control': 'no-store'})
+
+
+async def stream_category(category):
+    """Server-sent events: on a miss each article as its summary finishes, then the published payload and any upgrade"""
+    cache_key = cache_key_for(category)
+    yield sse_event('start', {'category': cache_key})
+    payload = await get_cached_payload(cache_key)
+    cached = payload is not None
+    if not cached:
+        print(f"[{datetime.now()}] Cache miss for {cache_key} - streaming summaries...")
+        build, progress = start_streamed_build(app.state.redis_raw, category)
+        if progress is not None:
+            async for article in progress.follow():
+                yield sse_event('article', article)
+        payload = await asyncio.shield(build)
+    yield payload_event(payload)
+    upgrade = pending_upgrades.get(category)
+    if upgrade is not None:
+        upgraded = await asyncio.shield(upgrade)
+        if upgraded is not None:
+            yield payload_event(upgraded)
+    yield sse_event('done', {'category': cache_key, 'cached': cached})
+
+
+def event_stream_response(category):
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return StreamingResponse(stream_category(category), media_type='text/event-stream', headers=headers)
+
+
+async def build_category(redis_client, category, priority='refresh', shared_summaries=None):
+    """Return (listing, summaries); summaries is None if the article list is unchanged since it was last published"""
+    async def fetch():
+        listing = await get_article_list(category)
+        if not refresh_planner.changed(category, listing) and await app.state.snapshots.load(cache_key_for(category)) is not None:
+            return listing, None
+        return listing, await fetch_article_data(listing)
+
+    listing, articles = await asyncio.wait_for(fetch(), timeout=REFRESH_FETCH_TIMEOUT)
+    if articles is None:
+        print(f"[{datetime.now()}] {category}: article list unchanged, keeping the published summaries")
+        return listing, None
+    summary_store = SummaryStore(redis_client, MODEL_NAME)
+    return listing, await get_summaries(articles, summary_store, shared_summaries, priority)
+
+
+def refresh_outcome(summaries):
+    if summaries is None:
+        return 'unchanged'
+    return 'published' if summaries else 'empty'
+
+
+def record_check(category, listing, summaries):
+    """Tell the planner about a check that was published or needed nothing; an empty build is retried next time"""
+    if summaries is None or summaries:
+        refresh_planner.record(category, listing)
+
+
+async def refresh_category(redis_client, redis_raw, category):
+    """Scheduled check of one category, which then reschedules itself for its adapted interval"""
+    fence = app.state.lease_keeper.fence(category)
+    try:
+        # Followers leave the category to the lease owner and just serve what it publishes.
+        if fence is None:
+            return
+        if category in building:
+            print(f"[{datetime.now()}] {category} is still being built by the full refresh, skipping this check")
+            return
+        building.add(category)
+        try:
+            with metrics.trace(f'refresh-{category}'):
+                listing, summaries = await build_category(redis_client, category)
+                if summaries:
+                    await publish_category(redis_raw, category, summaries, [fence])
+                    print(f"[{datetime.now()}] Refreshed {category}")
+                record_check(category, listing, summaries)
+        finally:
+            building.discard(category)
+        metrics.refreshes_total.inc(category=category, outcome=refresh_outcome(summaries))
+    except LeaseLost as e:
+        print(f"[{datetime.now()}] Dropped the refresh of {category}: {e}")
+        metrics.refreshes_total.inc(category=category, outcome='fenced')
+    except Exception as e:
+        print(f"[{datetime.now()}] Error refreshing {category}: {e!r}")
+        metrics.refreshes_total.inc(category=category, outcome='error')
+    finally:
+        interval = refresh_planner.interval(category)
+        scheduler.reschedule_job(refresh_job_id(category), trigger='interval', seconds=interval)
+        print(f"[{datetime.now()}] Next check of {category} in {interval}s")
+
+
+async def refresh_all_news_cache(redis_client, redis_raw, priority='refresh'):
     """Background task to refresh all news categories"""
-    print(f"[{datetime.now()}] Starting background news refresh...")
+    # Only the categories this worker holds the lease for; the other workers refresh the rest.
+    # Ones a timer is already building are left to it.
+    owned = [category for category in app.state.lease_keeper.owned() if category not in building]
+    if not owned:
+        print(f"[{datetime.now()}] No category leases held or all are already refreshing, following the other workers' refreshes")
+        return
+    print(f"[{datetime.now()}] Starting background news refresh ({priority}) of {', '.join(owned)}...")
     
+    building.update(owned)
     try:
-        all_summaries = await main()
-        
+        with metrics.trace('refresh'):
+            # One SharedSummaries for the whole run, so a story carried by several categories is summarized once
+            shared_summaries = SharedSummaries()
+            results = await asyncio.gather(
+                *(build_category(redis_client, category, priority, shared_summaries) for category in owned),
+                return_exceptions=True,
+            )
+            all_summaries = {}
+            listings = {}
+            for category, result in zip(owned, results):
+                if isinstance(result, Exception):
+                    print(f"[{datetime.now()}] Error refreshing {category}: {result!r}")
+                    metrics.refreshes_total.inc(category=category, outcome='error')
+                else:
+                    listings[category], all_summaries[category] = result
+            # A category whose lease lapsed while it was being built is left to its new owner
+            all_summaries = {category: summaries for category, summaries in all_summaries.items()
+                             if app.state.lease_keeper.fence(category) is not None}
+            fences = [app.state.lease_keeper.fence(category) for category in all_summaries]
+            await cache_all_summaries(redis_raw, all_summaries, fences)
         for category, summaries in all_summaries.items():
-            if category == 'default':
-                data_str = json.dumps({'Today\'s Top Headlines': summaries})
-                await redis_client.set('Today\'s Top Headlines', data_str, ex=86400)
-                print(f"[{datetime.now()}] Cached: Today's Top Headlines")
-            else:
-                data_str = json.dumps({category: summaries})
-                await redis_client.set(category, data_str, ex=86400)
-                print(f"[{datetime.now()}] Cached: {category}")
-        
+            record_check(category, listings[category], summaries)
+            metrics.refreshes_total.inc(category=category, outcome=refresh_outcome(summaries))
         print(f"[{datetime.now()}] Background news refresh completed!")
+        for priority_class, stats in inference_stats().items():
+            print(f"[{datetime.now()}] Inference queue '{priority_class}': depth {stats['depth']} (max {stats['max_depth']}), "
+                  f"{stats['admitted']} batches, mean wait {stats['mean_wait']:.2f}s, max wait {stats['max_wait']:.2f}s")
+        busiest_hosts = sorted(get_article_cache().stats().items(), key=lambda item: item[1]['lookups'], reverse=True)
+        for host, stats in busiest_hosts[:ARTICLE_CACHE_LOG_HOSTS]:
+            print(f"[{datetime.now()}] Article cache '{host}': {stats['lookups']} lookups, "
+                  f"{stats['hit_rate']:.0%} without a full download")
     except Exception as e:
         print(f"[{datetime.now()}] Error during refresh: {e}")
+    finally:
+        building.difference_update(owned)
 
 
 @asynccontextmanager
@@ -45,40 +418,62 @@ async def lifespan(app: FastAPI):
     redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
     app.state.redis = redis.from_url(redis_url, decode_responses=True)
     redis_client = app.state.redis
+    # Response payloads are stored as raw bytes (plain, gzip and brotli), so they need an undecoded client
+    app.state.redis_raw = redis.from_url(redis_url)
+    redis_raw = app.state.redis_raw
+    app.state.snapshots = SnapshotStore(redis_raw)
+    app.state.articles = ArticleStore(redis_client)
     app.state.http_client = httpx.AsyncClient()
+    invalidation_listener = asyncio.create_task(listen_for_invalidations(redis_raw, l1_cache))
+    search_listener = asyncio.create_task(follow_publishes(redis_raw, sync_search_index))
+    # Each category is refreshed by whichever worker holds its lease; the others only read.
+    app.state.lease_keeper = LeaseKeeper(redis_client, categories)
+    await app.state.lease_keeper.maintain_once()
     
-    # Initial cache population on startup
-    print(f"[{datetime.now()}] Populating initial cache...")
-    all_summaries = await main()
-    for category, summaries in all_summaries.items():
-        if category == 'default':
-            data_str = json.dumps({'Today\'s Top Headlines': summaries})
-            await redis_client.set('Today\'s Top Headlines', data_str, ex=86400)
-        else:
-            data_str = json.dumps({category: summaries})
-            await redis_client.set(category, data_str, ex=86400)
-    print(f"[{datetime.now()}] Initial cache populated!")
+    # Serve the last snapshot right away and run the first refresh in the background
+    with startup_profile.timed('warm start'):
+        restored = await warm_start(app.state.snapshots)
+    # With a snapshot already being served, catching up is backfill and yields to every other request
+    initial_priority = 'backfill' if restored else 'refresh'
+    app.state.initial_refresh = asyncio.create_task(refresh_all_news_cache(redis_client, redis_raw, initial_priority))
+    
+    # Every category gets its own timer, first runs spread across the hour instead of all at :58
+    for category in categories:
+        scheduler.add_job(
+            refresh_category,
+            'interval',
+            seconds=refresh_planner.base_interval,
+            next_run_time=datetime.now() + timedelta(seconds=refresh_planner.offset(category)),
+            args=[redis_client, redis_raw, category],
+            id=refresh_job_id(category)
+        )
     
-    # Schedule background refresh to run 1 minute before every hour (at :58)
-    scheduler.add_job(
-        refresh_all_news_cache,
-        'cron',
-        minute=58,  # Runs at :58 of every hour
-        args=[redis_client],
-        id='news_refresh_job'
-    )
+    # A lease taken over from a dead worker is checked right away rather than on the next timer
+    lease_maintenance = asyncio.create_task(app.state.lease_keeper.run(
+        lambda category: scheduler.modify_job(refresh_job_id(category), next_run_time=datetime.now())
+    ))
     
     # Start the scheduler
     scheduler.start()
-    print(f"[{datetime.now()}] Background scheduler started! Will refresh at :58 of every hour.")
+    print(f"[{datetime.now()}] Background scheduler started! {len(categories)} categories refresh on staggered, adaptive timers.")
+    startup_profile.report()
     
     yield
     
     # Cleanup on shutdown
     scheduler.shutdown()
+    app.state.initial_refresh.cancel()
+    invalidation_listener.cancel()
+    search_listener.cancel()
+    lease_maintenance.cancel()
+    # Handing the leases back lets another worker take over without waiting for them to expire
+    await app.state.lease_keeper.release_all()
     await app.state.http_client.aclose()
     await app.state.redis.close()
-    print(f"[{datetime.now()}] Scheduler and connections closed.")
+    await app.state.redis_raw.close()
+    await close_session()
+    shutdown_pool()
+    print(f"[{datetime.now()}] Scheduler, connections and summarizer workers closed.")
 
 
 app = FastAPI(lifespan=lifespan)
@@ -90,39 +485,126 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so CORS handling is timed too
+app.add_middleware(metrics.RequestMetricsMiddleware)
+
+
+@app.get('/metrics')
+async def prometheus_metrics():
+    """Stage timings, counters and inference queue stats in the Prometheus text format"""
+    for priority, stats in inference_stats().items():
+        metrics.inference_queue_depth.set(stats['depth'], priority=priority)
+        metrics.inference_wait_seconds.set(stats['mean_wait'], priority=priority, statistic='mean')
+        metrics.inference_wait_seconds.set(stats['max_wait'], priority=priority, statistic='max')
+    return PlainTextResponse(metrics.render(), media_type='text/plain; version=0.0.4')
+
+
+@app.get('/healthz')
+async def liveness():
+    """The process is up and the event loop is responsive"""
+    return {'status': 'ok'}
+
+
+@app.get('/readyz')
+async def readiness():
+    """Whether there is data to serve, and whether it is fresh or stale"""
+    generation = await app.state.snapshots.current_generation()
+    refreshing = not app.state.initial_refresh.done()
+    payloads = await app.state.snapshots.load_all()
+    if not payloads:
+        return JSONResponse(status_code=503, content={'status': 'empty', 'refreshing': refreshing})
+    # The snapshot is only as fresh as its oldest category
+    age = max(payload_age(payload) for payload in payloads.values())
+    status = 'fresh' if age <= STALE_AFTER else 'stale'
+    return {'status': status, 'generation': generation, 'data_age': age, 'refreshing': refreshing}
+
+
+async def backfill_article_index(category):
+    """Index a category from its current snapshot; only a category with no snapshot at all is built, once"""
+    async def backfill():
+        cache_key = cache_key_for(category)
+        payload = await get_cached_payload(cache_key)
+        if payload is None:
+            print(f"[{datetime.now()}] Empty index and no snapshot for {category} - fetching...")
+            # Publishing the build indexes its articles
+            await fill_cache_miss(app.state.redis_raw, category)
+            return
+        await app.state.articles.index(category, json.loads(payload['identity'])[cache_key])
+
+    await cache_miss_builds.do(f'index:{category}', backfill)
+
+
+async def article_page(category, cursor, limit, fields):
+    """One page of a category from the per-article index, newest first, with only the requested fields"""
+    limit = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    field_list = fields.split(',') if fields else list(ARTICLE_FIELDS)
+    unknown = [field for field in field_list if field not in ARTICLE_FIELDS]
+    if limit < 1 or unknown:
+        detail = f"unknown fields: {', '.join(unknown)}" if unknown else 'limit must be positive'
+        return JSONResponse(status_code=400, content={'detail': detail, 'fields': list(ARTICLE_FIELDS)})
+    try:
+        articles, next_cursor = await app.state.articles.page(category, cursor, limit, field_list)
+        if not articles and cursor is None:
+            await backfill_article_index(category)
+            articles, next_cursor = await app.state.articles.page(category, cursor, limit, field_list)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={'detail': str(e)})
+    return {'category': cache_key_for(category), 'articles': articles, 'next_cursor': next_cursor}
 
 
 @app.get('/news')
-async def get_summaries_default():
-    """Return cached breaking news instantly"""
-    redis_client = app.state.redis
-    cached = await redis_client.get('Today\'s Top Headlines')
-    
-    if cached:
-        return json.loads(cached)
+async def get_summaries_default(request: Request, cursor: str | None = None, limit: int | None = None, fields: str | None = None):
+    """Return cached breaking news instantly; cursor, limit or fields switch to a paginated listing"""
+    if cursor is not None or limit is not None or fields is not None:
+        return await article_page('default', cursor, limit, fields)
+    payload = await get_cached_payload(HEADLINES_KEY)
     
-    # Fallback: fetch if cache is empty (shouldn't happen after startup)
-    print(f"[{datetime.now()}] Cache miss for Today's Top Headlines - fetching...")
-    articles = get_article_contents(API_KEY, 'default')
-    summarized_articles = get_summaries(articles)
-    data_str = json.dumps({'Today\'s Top Headlines': summarized_articles})
-    await redis_client.set('Today\'s Top Headlines', data_str, ex=86400)
-    return json.loads(data_str)
+    if payload is None:
+        if request.headers.get('x-cached-only'):
+            return not_cached_response()
+        # Fallback: fetch if cache is empty (shouldn't happen after startup)
+        print(f"[{datetime.now()}] Cache miss for Today's Top Headlines - fetching...")
+        payload = await fill_cache_miss(app.state.redis_raw, 'default')
+    return payload_response(request, payload)
+
+
+@app.get('/news/stream')
+async def stream_summaries_default():
+    """Stream breaking news as server-sent events"""
+    return event_stream_response('default')
+
+
+@app.get('/news/{category}/stream')
+async def stream_summaries_by_category(category: str):
+    """Stream category news as server-sent events"""
+    return event_stream_response(category)
 
 
 @app.get('/news/{category}')
-async def get_summaries_by_category(category: str):
-    """Return cached category news instantly"""
-    redis_client = app.state.redis
-    cached = await redis_client.get(category)
-    
-    if cached:
-        return json.loads(cached)
+async def get_summaries_by_category(category: str, request: Request, cursor: str | None = None, limit: int | None = None,
+                                    fields: str | None = None):
+    """Return cached category news instantly; cursor, limit or fields switch to a paginated listing"""
+    if cursor is not None or limit is not None or fields is not None:
+        return await article_page(category, cursor, limit, fields)
+    cache_key = cache_key_for(category)
+    payload = await get_cached_payload(cache_key)
     
-    # Fallback: fetch if cache is empty
-    print(f"[{datetime.now()}] Cache miss for {category} - fetching...")
-    articles = get_article_contents(API_KEY, category)
-    summarized_articles = get_summaries(articles)
-    data_str = json.dumps({category: summarized_articles})
-    await redis_client.set(category, data_str, ex=86400)
-    return json.loads(data_str)
+    if payload is None:
+        if request.headers.get('x-cached-only'):
+            return not_cached_response()
+        # Fallback: fetch if cache is empty
+        print(f"[{datetime.now()}] Cache miss for {cache_key} - fetching...")
+        payload = await fill_cache_miss(app.state.redis_raw, category)
+    return payload_response(request, payload, category)
+
+
+@app.get('/search')
+async def search(q: str, limit: int = DEFAULT_RESULTS, category: str | None = None):
+    """Articles across every category ranked by BM25 against the query, optionally within one category"""
+    start_time = time.perf_counter()
+    results = search_index.search(q, min(max(limit, 1), MAX_RESULTS), category)
+    return {
+        'query': q,
+        'results': [dict(article, score=round(score, 4)) for score, article in results],
+        'took_ms': round((time.perf_counter() - start_time) * 1000, 3),
+    }
@@ -0,0 +1,195 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+
+
+# Where per-refresh traces are written; tracing is off when unset
+METRICS_TRACE_DIR = os.getenv('METRICS_TRACE_DIR')
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+_registry = []
+_active_traces = []
+_lock = threading.Lock()
+
+
+def escape_label_value(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def escape_help(text):
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def format_labels(labelnames, values):
+    if not labelnames:
+        return ''
+    pairs = ','.join(f'{name}="{escape_label_value(value)}"' for name, value in zip(labelnames, values))
+    return '{' + pairs + '}'
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        _registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self, kind='counter'):
+        lines = [f'# HELP {self.name} {escape_help(self.documentation)}', f'# TYPE {self.name} {kind}']
+        for key, value in sorted(self.values.items()):
+            lines.append(f'{self.name}{format_labels(self.labelnames, key)} {value}')
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with _lock:
+            self.values[key] = value
+
+    def render(self, kind='gauge'):
+        return super().render(kind)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus text format."""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=STAGE_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self.series = {}
+        _registry.append(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with _lock:
+            series = self.series.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {escape_help(self.documentation)}', f'# TYPE {self.name} histogram']
+        for key, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                labels = format_labels(self.labelnames + ('le',), key + (str(bound),))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {total}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+stage_seconds = Histogram('news_stage_seconds', 'Seconds spent in each pipeline stage', ['stage', 'category', 'host'])
+request_seconds = Histogram('news_request_seconds', 'Seconds until the response headers were sent', ['route', 'status'])
+articles_total = Counter('news_articles_total', 'Candidate articles by source host and outcome', ['host', 'outcome'])
+summary_store_total = Counter('news_summary_store_total', 'Summary store lookups', ['result'])
+cache_lookups_total = Counter('news_cache_lookups_total', 'Payload lookups by the layer that answered', ['layer'])
+article_cache_total = Counter('news_article_cache_total', 'Article cache lookups by source host and result', ['host', 'result'])
+refreshes_total = Counter('news_refreshes_total', 'Category refreshes by outcome', ['category', 'outcome'])
+inference_queue_depth = Gauge('news_inference_queue_depth', 'Batches waiting for an inference slot', ['priority'])
+inference_admitted_total = Counter('news_inference_admitted_total', 'Batches admitted to the inference workers', ['priority'])
+inference_wait_seconds = Gauge('news_inference_wait_seconds', 'Mean and max wait for an inference slot', ['priority', 'statistic'])
+
+
+def observe_stage(stage, seconds, category='', host=''):
+    stage_seconds.observe(seconds, stage=stage, category=category, host=host)
+    if _active_traces:
+        span = {'stage': stage, 'category': category, 'host': host, 'seconds': round(seconds, 6), 'ended_at': time.time()}
+        with _lock:
+            for spans in _active_traces:
+                spans.append(span)
+
+
+@contextmanager
+def stage(name, category='', host=''):
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - start_time, category, host)
+
+
+@contextmanager
+def collect_spans():
+    """Yield a list that receives every stage observed, by any task or thread, while the block runs"""
+    spans = []
+    with _lock:
+        _active_traces.append(spans)
+    try:
+        yield spans
+    finally:
+        with _lock:
+            _active_traces.remove(spans)
+
+
+@contextmanager
+def trace(name):
+    """Collect every stage observed while the block runs and dump them as JSON to METRICS_TRACE_DIR.
+
+    Stages from other work that overlaps the block (a cache miss, say) are
+    included too; the trace is a timeline of the process, not of one task.
+    """
+    if not METRICS_TRACE_DIR:
+        yield
+        return
+    started_at = time.time()
+    try:
+        with collect_spans() as spans:
+            yield
+    finally:
+        path = os.path.join(METRICS_TRACE_DIR, f"{name}-{datetime.now():%Y%m%dT%H%M%S}.json")
+        try:
+            os.makedirs(METRICS_TRACE_DIR, exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump({'name': name, 'started_at': started_at, 'seconds': time.time() - started_at, 'spans': spans}, f, indent=1)
+        except OSError as e:
+            print(f"[{datetime.now()}] Could not write trace {path}: {e}")
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware recording request_seconds per route until the response headers are sent.
+
+    It only wraps `send`, so streamed bodies such as server-sent events pass
+    through untouched, unlike with BaseHTTPMiddleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        start_time = time.perf_counter()
+
+        async def timed_send(message):
+            if message['type'] == 'http.response.start':
+                # The router has matched by now and left the route in the shared scope
+                route = scope.get('route')
+                request_seconds.observe(time.perf_counter() - start_time,
+                                        route=getattr(route, 'path', 'unmatched'), status=message['status'])
+            await send(message)
+
+        await self.app(scope, receive, timed_send)
+
+
+def render():
+    """Every metric in the Prometheus text exposition format"""
+    with _lock:
+        lines = [line for metric in _registry for line in metric.render()]
+    return '\n'.join(lines) + '\n'
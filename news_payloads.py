@@ -0,0 +1,70 @@
+import gzip
+import hashlib
+import json
+import time
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+PAYLOAD_TTL = 86400
+
+
+def encode_payload(data, published_at=None):
+    """Serialize a response once and keep its compressed variants, ETag and publish time alongside it."""
+    body = json.dumps(data, separators=(',', ':')).encode()
+    payload = {
+        'etag': f'"{hashlib.sha256(body).hexdigest()[:32]}"'.encode(),
+        'published_at': str(published_at or time.time()).encode(),
+        'identity': body,
+        'gzip': gzip.compress(body, compresslevel=9),
+    }
+    if brotli is not None:
+        payload['br'] = brotli.compress(body, quality=11)
+    return payload
+
+
+def parse_accept_encoding(accept_encoding):
+    """{coding: q} from an Accept-Encoding header; a malformed q-value counts as 0"""
+    accepted = {}
+    for part in accept_encoding.lower().split(','):
+        coding, *params = [piece.strip() for piece in part.split(';')]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(accept_encoding, payload):
+    accepted = parse_accept_encoding(accept_encoding)
+
+    def acceptable(coding):
+        return accepted.get(coding, accepted.get('*', 0.0)) > 0
+
+    if acceptable('br') and 'br' in payload:
+        return 'br'
+    if acceptable('gzip'):
+        return 'gzip'
+    return 'identity'
+
+
+def etag_matches(if_none_match, etag):
+    """Weak comparison of an If-None-Match header against one ETag, as RFC 9110 specifies for GET"""
+    if if_none_match.strip() == '*':
+        return True
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return etag.removeprefix('W/') in {candidate.removeprefix('W/') for candidate in candidates}
+
+
+def payload_age(payload, now=None):
+    """Seconds since the payload's data was published"""
+    return max(0, int((now or time.time()) - float(payload['published_at'])))
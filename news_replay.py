@@ -0,0 +1,164 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+from pathlib import Path
+import aiohttp
+from aiohttp import web
+from dotenv import load_dotenv
+
+
+CATEGORIES = ['default', 'business', 'entertainment', 'sports', 'technology', 'science', 'health']
+NEWS_API_URL = 'https://newsapi.org/v2'
+RECORD_CONCURRENCY = 8
+RECORD_TIMEOUT = 20
+
+
+def article_id(url):
+    return hashlib.sha1(url.encode()).hexdigest()[:16]
+
+
+def listing_path(corpus, category):
+    return Path(corpus) / 'listings' / f'{category}.json'
+
+
+def article_path(corpus, url):
+    return Path(corpus) / 'articles' / f'{article_id(url)}.html'
+
+
+async def record(corpus, categories, api_key):
+    """Save each category's NewsAPI listing and the HTML of every article it links to.
+
+    Every candidate is recorded, not just the first few, because the
+    pipelines differ in how many candidates they go through.
+    """
+    (Path(corpus) / 'listings').mkdir(parents=True, exist_ok=True)
+    (Path(corpus) / 'articles').mkdir(parents=True, exist_ok=True)
+    index = {}
+    semaphore = asyncio.Semaphore(RECORD_CONCURRENCY)
+    timeout = aiohttp.ClientTimeout(total=RECORD_TIMEOUT)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        async def record_article(url):
+            async with semaphore:
+                try:
+                    async with session.get(url) as response:
+                        body = await response.read()
+                        entry = {'url': url, 'status': response.status, 'content_type': response.headers.get('Content-Type', 'text/html')}
+                except Exception as e:
+                    print(f'Could not record {url}: {e!r}')
+                    return
+            article_path(corpus, url).write_bytes(body)
+            index[article_id(url)] = entry
+
+        urls = set()
+        for category in categories:
+            query = 'country=us' if category == 'default' else f'category={category}'
+            async with session.get(f'{NEWS_API_URL}/top-headlines?{query}&apiKey={api_key}') as response:
+                listing = await response.json()
+            listing_path(corpus, category).write_text(json.dumps(listing, indent=1))
+            urls.update(article['url'] for article in listing.get('articles', []) if article.get('url'))
+            print(f"{category}: {len(listing.get('articles', []))} articles listed")
+        await asyncio.gather(*(record_article(url) for url in sorted(urls)))
+    (Path(corpus) / 'index.json').write_text(json.dumps(index, indent=1))
+    print(f'Recorded {len(index)} of {len(urls)} articles into {corpus}')
+
+
+class ReplayServer:
+    """Serves a recorded corpus as a NewsAPI stand-in plus the publisher sites.
+
+    Listing responses point article URLs back at this server. Every response
+    is delayed by `latency` seconds plus up to `jitter` more. A `failure_rate`
+    share of article requests fail with a 503 (half) or a dropped connection
+    (half); the choices are seeded, so runs are repeatable.
+    """
+
+    def __init__(self, corpus, latency=0.0, jitter=0.0, api_latency=None, failure_rate=0.0, seed=0):
+        self.corpus = Path(corpus)
+        self.latency = latency
+        self.jitter = jitter
+        self.api_latency = latency if api_latency is None else api_latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.index = json.loads((self.corpus / 'index.json').read_text())
+        self.base_url = None
+        self.runner = None
+
+    async def delay(self, latency):
+        await asyncio.sleep(latency + self.random.uniform(0, self.jitter))
+
+    async def top_headlines(self, request):
+        category = request.query.get('category', 'default')
+        path = listing_path(self.corpus, category)
+        if not path.exists():
+            return web.json_response({'status': 'error', 'code': 'categoryNotRecorded'}, status=400)
+        await self.delay(self.api_latency)
+        listing = json.loads(path.read_text())
+        for article in listing.get('articles', []):
+            if article.get('url'):
+                article['url'] = f"{self.base_url}/articles/{article_id(article['url'])}"
+        return web.json_response(listing)
+
+    async def article(self, request):
+        entry = self.index.get(request.match_info['article_id'])
+        if entry is None:
+            raise web.HTTPNotFound()
+        await self.delay(self.latency)
+        if self.random.random() < self.failure_rate:
+            if self.random.random() < 0.5:
+                raise web.HTTPServiceUnavailable()
+            request.transport.close()
+            return web.Response()
+        body = article_path(self.corpus, entry['url']).read_bytes()
+        return web.Response(body=body, status=entry['status'], headers={'Content-Type': entry['content_type']})
+
+    async def start(self, host='127.0.0.1', port=0):
+        app = web.Application()
+        app.router.add_get('/v2/top-headlines', self.top_headlines)
+        app.router.add_get('/articles/{article_id}', self.article)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f'http://{host}:{port}'
+        return f'{self.base_url}/v2'
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+async def serve(args):
+    server = ReplayServer(args.corpus, args.latency, args.jitter, args.api_latency, args.failure_rate, args.seed)
+    news_api_url = await server.start(args.host, args.port)
+    print(f'Replaying {args.corpus}: NEWS_API_URL={news_api_url}')
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record NewsAPI listings and article HTML, or replay them locally.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    record_parser = subparsers.add_parser('record', help='capture a fixture corpus (needs NEWS_API_KEY)')
+    record_parser.add_argument('corpus')
+    record_parser.add_argument('--categories', default=','.join(CATEGORIES))
+    serve_parser = subparsers.add_parser('serve', help='serve a corpus as a NewsAPI stand-in')
+    serve_parser.add_argument('corpus')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every article response')
+    serve_parser.add_argument('--jitter', type=float, default=0.0, help='up to this many extra seconds, uniformly random')
+    serve_parser.add_argument('--api-latency', type=float, help='seconds added to listing responses, defaults to --latency')
+    serve_parser.add_argument('--failure-rate', type=float, default=0.0, help='share of article requests that fail')
+    serve_parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        load_dotenv()
+        asyncio.run(record(args.corpus, args.categories.split(','), os.getenv('NEWS_API_KEY')))
+    else:
+        asyncio.run(serve(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+import json
+import os
+from datetime import datetime
+from redis.exceptions import WatchError
+from leases import LeaseLost
+from news_payloads import PAYLOAD_TTL, encode_payload
+
+
+CURRENT_KEY = 'news:current'
+GENERATION_COUNTER_KEY = 'news:generation'
+GENERATIONS_KEY = 'news:generations'
+# Copy of the current generation's manifest, swapped in the same transaction as CURRENT_KEY
+CURRENT_MANIFEST_KEY = 'news:manifest:current'
+KEEP_GENERATIONS = 3
+
+
+def manifest_key(generation):
+    return f'news:gen:{generation}'
+
+
+def payload_id(payload):
+    return payload['etag'].decode().strip('"')
+
+
+def payload_storage_key(payload_id):
+    return f'news:payload:{payload_id}'
+
+
+def decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class SnapshotStore:
+    """Publishes categories to Redis as versioned, atomically swapped snapshots.
+
+    Payloads are content-addressed, and each generation is a manifest hash that
+    maps cache keys to payload ids. A publish writes the new payloads and
+    manifest and moves the current-generation pointer in one MULTI/EXEC, so
+    readers see either the old snapshot or the new one, never a mix. A publish
+    that only covers some keys carries the others over from the current
+    generation. The current manifest is also kept under a fixed key, so a
+    read is an HGET for the payload id and an HGETALL for the payload.
+    """
+
+    def __init__(self, redis_raw, keep_generations=KEEP_GENERATIONS):
+        self.redis = redis_raw
+        self.keep_generations = keep_generations
+
+    async def current_generation(self):
+        generation = await self.redis.get(CURRENT_KEY)
+        return int(generation) if generation is not None else None
+
+    async def load(self, cache_key):
+        stored_id = await self.redis.hget(CURRENT_MANIFEST_KEY, cache_key)
+        if stored_id is None:
+            return None
+        stored = await self.redis.hgetall(payload_storage_key(decode(stored_id)))
+        if not stored:
+            return None
+        return {decode(field): value for field, value in stored.items()}
+
+    async def load_all(self):
+        """Return {cache_key: payload} for the whole current generation."""
+        manifest = await self.redis.hgetall(CURRENT_MANIFEST_KEY)
+        cache_keys = [decode(key) for key in manifest]
+        pipe = self.redis.pipeline(transaction=False)
+        for payload_id in manifest.values():
+            pipe.hgetall(payload_storage_key(decode(payload_id)))
+        stored = await pipe.execute()
+        return {
+            cache_key: {decode(field): value for field, value in payload.items()}
+            for cache_key, payload in zip(cache_keys, stored) if payload
+        }
+
+    async def publish(self, payloads, fences=()):
+        """Publish {cache_key: payload}, keeping the previous payload for keys whose payload is None.
+
+        `fences` are (key, token) pairs from leases.Lease.fence(); the publish
+        raises LeaseLost instead if any key has moved on to a newer token.
+        Returns the new generation, or None if nothing was publishable.
+        """
+        if not any(payload is not None for payload in payloads.values()):
+            print(f"[{datetime.now()}] Refresh produced no articles, keeping the current snapshot")
+            return None
+        new_payloads = {payload_id(payload): payload for payload in payloads.values() if payload is not None}
+        generation = await self.redis.incr(GENERATION_COUNTER_KEY)
+        while True:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                try:
+                    # A concurrent publish moving the pointer makes us rebuild the manifest on top of it.
+                    await pipe.watch(CURRENT_KEY, *(key for key, _ in fences))
+                    for key, token in fences:
+                        latest = await pipe.get(key)
+                        if latest is None or int(latest) != token:
+                            raise LeaseLost(f'fencing token {token} for {decode(key)} is stale (latest {decode(latest)})')
+                    stored_manifest = await pipe.hgetall(CURRENT_MANIFEST_KEY)
+                    current = await pipe.get(CURRENT_KEY)
+                    if not stored_manifest and current is not None:
+                        # Published before the current manifest was kept under its own key
+                        stored_manifest = await pipe.hgetall(manifest_key(decode(current)))
+                    manifest = {decode(key): decode(value) for key, value in stored_manifest.items()}
+                    for cache_key, payload in payloads.items():
+                        if payload is not None:
+                            manifest[cache_key] = payload_id(payload)
+                        elif cache_key in manifest:
+                            print(f"[{datetime.now()}] No articles for {cache_key}, keeping the previous generation's payload")
+                    pipe.multi()
+                    for new_id, payload in new_payloads.items():
+                        pipe.hset(payload_storage_key(new_id), mapping=payload)
+                    for referenced_id in set(manifest.values()):
+                        pipe.expire(payload_storage_key(referenced_id), PAYLOAD_TTL)
+                    # Manifests are kept as long as the payloads they point to
+                    pipe.hset(manifest_key(generation), mapping=manifest)
+                    pipe.expire(manifest_key(generation), PAYLOAD_TTL)
+                    pipe.delete(CURRENT_MANIFEST_KEY)
+                    pipe.hset(CURRENT_MANIFEST_KEY, mapping=manifest)
+                    pipe.lpush(GENERATIONS_KEY, generation)
+                    pipe.set(CURRENT_KEY, generation)
+                    await pipe.execute()
+                    break
+                except WatchError:
+                    continue
+        await self.collect_garbage()
+        return generation
+
+    async def rollback(self):
+        """Point readers back at the previous generation. Returns it, or None if there is none.
+
+        Like a publish, the caller announces it with l1_cache.publish_invalidation.
+        """
+        while True:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                try:
+                    await pipe.watch(CURRENT_KEY, GENERATIONS_KEY)
+                    generations = await pipe.lrange(GENERATIONS_KEY, 0, 1)
+                    if len(generations) < 2:
+                        return None
+                    latest, previous = decode(generations[0]), decode(generations[1])
+                    manifest = await pipe.hgetall(manifest_key(previous))
+                    if not manifest:
+                        # Expired along with its payloads
+                        return None
+                    pipe.multi()
+                    pipe.lpop(GENERATIONS_KEY)
+                    pipe.delete(CURRENT_MANIFEST_KEY)
+                    pipe.hset(CURRENT_MANIFEST_KEY, mapping=manifest)
+                    pipe.set(CURRENT_KEY, previous)
+                    pipe.delete(manifest_key(latest))
+                    await pipe.execute()
+                    return int(previous)
+                except WatchError:
+                    continue
+
+    async def collect_garbage(self):
+        # Payloads are not deleted here: they may be shared with newer generations and expire on their own.
+        old_generations = await self.redis.lrange(GENERATIONS_KEY, self.keep_generations, -1)
+        if old_generations:
+            pipe = self.redis.pipeline(transaction=False)
+            for generation in old_generations:
+                pipe.delete(manifest_key(decode(generation)))
+            pipe.ltrim(GENERATIONS_KEY, 0, self.keep_generations - 1)
+            await pipe.execute()
+
+
+def save_local_snapshot(path, payloads):
+    """Write the published payloads to disk so a restart can serve them before Redis has data."""
+    snapshot = {
+        cache_key: {'published_at': float(payload['published_at']), 'data': json.loads(payload['identity'])}
+        for cache_key, payload in payloads.items()
+    }
+    temporary_path = f'{path}.tmp'
+    with open(temporary_path, 'w') as f:
+        json.dump(snapshot, f)
+    os.replace(temporary_path, path)
+
+
+def load_local_snapshot(path):
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {cache_key: encode_payload(entry['data'], entry['published_at']) for cache_key, entry in snapshot.items()}
@@ -0,0 +1,74 @@
+import hashlib
+import math
+import os
+import time
+
+
+REFRESH_BASE_INTERVAL = int(os.getenv('REFRESH_BASE_INTERVAL', '3600'))
+REFRESH_MIN_INTERVAL = int(os.getenv('REFRESH_MIN_INTERVAL', '900'))
+REFRESH_MAX_INTERVAL = int(os.getenv('REFRESH_MAX_INTERVAL', '14400'))
+CHANGE_RATE_ALPHA = 0.3
+
+
+def listing_fingerprint(listing):
+    """Hash of the set of article URLs in a NewsAPI response, independent of their order"""
+    urls = sorted(article['url'] for article in listing.get('articles', []) if article.get('url'))
+    return hashlib.sha1('\n'.join(urls).encode()).hexdigest()
+
+
+class RefreshPlanner:
+    """Gives every category its own refresh timer.
+
+    Categories start at offsets spread evenly across one base interval, so
+    their refreshes don't all land at once. Each check compares the article
+    list's fingerprint with the last published one and updates a moving average of
+    changes per second. Intervals are then shared out in proportion to the
+    square root of those rates, normalized so that all categories together
+    still check len(categories) times per base interval: busy categories are
+    checked more often, quiet ones less, for the same total.
+    """
+
+    def __init__(self, categories, base_interval=REFRESH_BASE_INTERVAL, min_interval=REFRESH_MIN_INTERVAL,
+                 max_interval=REFRESH_MAX_INTERVAL):
+        self.categories = list(categories)
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.fingerprints = {}
+        self.last_checked = {}
+        # Start from the old schedule's assumption of one change per base interval
+        self.change_rates = {category: 1 / base_interval for category in self.categories}
+
+    def offset(self, category):
+        """Seconds after startup of a category's first check"""
+        return self.base_interval * (self.categories.index(category) + 1) / len(self.categories)
+
+    def changed(self, category, listing):
+        """Whether a category's article list differs from the last one recorded"""
+        return listing_fingerprint(listing) != self.fingerprints.get(category)
+
+    def record(self, category, listing):
+        """Remember a category's article list once its summaries are published, and update its change rate"""
+        fingerprint = listing_fingerprint(listing)
+        previous = self.fingerprints.get(category)
+        now = time.monotonic()
+        self.fingerprints[category] = fingerprint
+        if previous is not None:
+            # Back-to-back checks (startup, then the first timer) would otherwise read as a huge rate
+            elapsed = max(self.min_interval, now - self.last_checked[category])
+            changed = fingerprint != previous
+            rate = self.change_rates[category]
+            self.change_rates[category] = (1 - CHANGE_RATE_ALPHA) * rate + CHANGE_RATE_ALPHA * changed / elapsed
+        self.last_checked[category] = now
+
+    def interval(self, category):
+        """Seconds until a category's next check"""
+        weights = {name: math.sqrt(rate) for name, rate in self.change_rates.items()}
+        total = sum(weights.values())
+        if total == 0:
+            return self.base_interval
+        # Checks per second across all categories stay at len(categories) / base_interval.
+        frequency = len(self.categories) / self.base_interval * weights[category] / total
+        if frequency == 0:
+            return self.max_interval
+        return int(min(self.max_interval, max(self.min_interval, 1 / frequency)))
@@ -0,0 +1,167 @@
+import asyncio
+import heapq
+import math
+import os
+import re
+from array import array
+from collections import Counter, OrderedDict
+from datetime import datetime
+from article_store import article_id
+from l1_cache import INVALIDATION_CHANNEL
+
+
+# Oldest articles are dropped once the index holds this many
+SEARCH_INDEX_MAX_DOCS = int(os.getenv('SEARCH_INDEX_MAX_DOCS', '5000'))
+DEFAULT_RESULTS = 10
+MAX_RESULTS = 50
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Term frequencies are weighted per field, so a word in the title counts for more than one in the summary
+FIELD_WEIGHTS = {'title': 3, 'summary': 1, 'source': 2, 'author': 2}
+# Postings are compacted once this share of the documents they point at has been removed
+COMPACT_RATIO = 0.25
+TOKEN = re.compile(r'\w+')
+STOPWORDS = frozenset('a an and are as at be by for from has in is it its of on or that the to was were will with'.split())
+RESULT_FIELDS = ('id', 'title', 'summary', 'author', 'source', 'image', 'url', 'published_at', 'tier')
+
+
+def tokenize(text):
+    return [token for token in TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def term_frequencies(article):
+    frequencies = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(article.get(field) or ''):
+            frequencies[token] += weight
+    return frequencies
+
+
+class SearchIndex:
+    """In-memory inverted index over published articles, ranked with BM25.
+
+    Each term maps to two parallel arrays, document numbers ('I') and
+    weighted term frequencies ('H'). Document numbers only ever grow, so
+    adding a document appends to the arrays and they stay sorted. Removing or
+    replacing one only marks its number dead and adjusts the document
+    frequencies; the dead entries are filtered out of the postings in one
+    pass once they make up COMPACT_RATIO of the index.
+    """
+
+    def __init__(self, max_docs=SEARCH_INDEX_MAX_DOCS):
+        self.max_docs = max_docs
+        self.postings = {}
+        self.doc_freq = Counter()
+        # article id -> document number, oldest first
+        self.doc_numbers = OrderedDict()
+        # document number -> (article fields, categories, length, terms, fingerprint)
+        self.docs = {}
+        self.dead = set()
+        self.next_doc = 0
+        self.total_length = 0
+
+    def __len__(self):
+        return len(self.docs)
+
+    def index(self, category, articles):
+        """Add a category's published articles; unchanged ones are left alone, changed ones replaced"""
+        for article in articles or ():
+            identifier = article_id(article)
+            fingerprint = (article.get('title'), article.get('summary'), article.get('tier'))
+            doc = self.doc_numbers.get(identifier)
+            if doc is not None:
+                _, categories, _, _, previous = self.docs[doc]
+                if previous == fingerprint:
+                    categories.add(category)
+                    self.doc_numbers.move_to_end(identifier)
+                    continue
+                categories = categories | {category}
+                self.remove(identifier)
+            else:
+                categories = {category}
+            self.add(identifier, article, categories, fingerprint)
+        while len(self.doc_numbers) > self.max_docs:
+            self.remove(next(iter(self.doc_numbers)))
+        if len(self.dead) > COMPACT_RATIO * max(len(self.docs), 1):
+            self.compact()
+
+    def add(self, identifier, article, categories, fingerprint):
+        doc = self.next_doc
+        self.next_doc += 1
+        frequencies = term_frequencies(article)
+        for term, frequency in frequencies.items():
+            documents, counts = self.postings.setdefault(term, (array('I'), array('H')))
+            documents.append(doc)
+            counts.append(min(frequency, 0xFFFF))
+            self.doc_freq[term] += 1
+        length = sum(frequencies.values())
+        fields = dict({field: article.get(field) for field in RESULT_FIELDS}, id=identifier)
+        self.docs[doc] = (fields, categories, length, tuple(frequencies), fingerprint)
+        self.doc_numbers[identifier] = doc
+        self.total_length += length
+
+    def remove(self, identifier):
+        doc = self.doc_numbers.pop(identifier)
+        _, _, length, terms, _ = self.docs.pop(doc)
+        for term in terms:
+            self.doc_freq[term] -= 1
+            if not self.doc_freq[term]:
+                del self.doc_freq[term]
+        self.total_length -= length
+        self.dead.add(doc)
+
+    def compact(self):
+        for term in list(self.postings):
+            documents, counts = self.postings[term]
+            if term not in self.doc_freq:
+                del self.postings[term]
+                continue
+            live = [index for index, doc in enumerate(documents) if doc not in self.dead]
+            self.postings[term] = (array('I', (documents[index] for index in live)), array('H', (counts[index] for index in live)))
+        self.dead.clear()
+
+    def search(self, query, limit=DEFAULT_RESULTS, category=None):
+        """Return up to `limit` (score, article) pairs, best first"""
+        if not self.docs:
+            return []
+        total_docs = len(self.docs)
+        average_length = self.total_length / total_docs or 1
+        scores = Counter()
+        for term in set(tokenize(query)):
+            doc_freq = self.doc_freq.get(term)
+            if not doc_freq:
+                continue
+            idf = math.log(1 + (total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+            documents, counts = self.postings[term]
+            for doc, frequency in zip(documents, counts):
+                entry = self.docs.get(doc)
+                if entry is None:
+                    continue
+                length_norm = BM25_K1 * (1 - BM25_B + BM25_B * entry[2] / average_length)
+                scores[doc] += idf * frequency * (BM25_K1 + 1) / (frequency + length_norm)
+        if category is not None:
+            scores = {doc: score for doc, score in scores.items() if category in self.docs[doc][1]}
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(score, dict(self.docs[doc][0], categories=sorted(self.docs[doc][1]))) for doc, score in best]
+
+
+async def follow_publishes(redis_client, sync, retry_delay=1):
+    """Call sync(cache_key) for every publish announced on the invalidation channel, sync(None) for '*' and on (re)subscribe"""
+    while True:
+        try:
+            async with redis_client.pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Publishes made while we were not subscribed were missed, so catch up on everything.
+                await sync(None)
+                async for message in pubsub.listen():
+                    if message['type'] != 'message':
+                        continue
+                    key = message['data']
+                    if isinstance(key, bytes):
+                        key = key.decode()
+                    await sync(None if key == '*' else key)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[{datetime.now()}] Search index listener error: {e}")
+            await asyncio.sleep(retry_delay)
@@ -0,0 +1,70 @@
+import os
+import re
+import numpy as np
+from input_prep import split_sentences
+
+
+RANKED_INPUT_WORDS = int(os.getenv('RANKED_INPUT_WORDS', '400'))
+MIN_SENTENCE_WORDS = 5
+LEAD_BONUS = 0.3
+TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def score_sentences(sentences):
+    """Cosine similarity of each sentence's TF-IDF vector to the article centroid.
+
+    The term matrix is kept in sparse (row, column, value) form, and every step
+    is a NumPy bincount over the non-zeros, so a whole article is a handful of
+    vector operations.
+    """
+    vocabulary = {}
+    rows = []
+    cols = []
+    for row, sentence in enumerate(sentences):
+        for token in TOKEN.findall(sentence.lower()):
+            rows.append(row)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+    sentence_count = len(sentences)
+    if not cols:
+        return np.zeros(sentence_count)
+    vocabulary_size = len(vocabulary)
+    cells, counts = np.unique(np.array(rows) * vocabulary_size + np.array(cols), return_counts=True)
+    rows, cols = np.divmod(cells, vocabulary_size)
+    document_frequency = np.bincount(cols, minlength=vocabulary_size)
+    idf = np.log((1 + sentence_count) / (1 + document_frequency)) + 1
+    weights = (1 + np.log(counts)) * idf[cols]
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=sentence_count))
+    weights /= norms[rows]
+    centroid = np.bincount(cols, weights=weights, minlength=vocabulary_size) / sentence_count
+    centroid /= np.linalg.norm(centroid)
+    return np.bincount(rows, weights=weights * centroid[cols], minlength=sentence_count)
+
+
+def condense(article_text, target_words=RANKED_INPUT_WORDS):
+    """Keep the most central sentences, in their original order, up to about target_words words.
+
+    Short fragments (bylines, captions, link text) are dropped, and early
+    sentences get a small bonus because news leads carry the key facts.
+    """
+    sentences = [sentence.strip() for sentence in split_sentences(article_text)]
+    word_counts = np.array([len(sentence.split()) for sentence in sentences])
+    if word_counts.sum() <= target_words:
+        return article_text
+    scores = score_sentences(sentences)
+    scores *= 1 + LEAD_BONUS / (1 + np.arange(len(sentences)))
+    scores[word_counts < MIN_SENTENCE_WORDS] = -1
+    selected = []
+    total_words = 0
+    for index in np.argsort(-scores, kind='stable'):
+        if scores[index] < 0 or total_words >= target_words:
+            break
+        selected.append(index)
+        total_words += word_counts[index]
+    if not selected:
+        # Every sentence was a short fragment, so fall back to the lead
+        for index in range(len(sentences)):
+            if total_words >= target_words:
+                break
+            selected.append(index)
+            total_words += word_counts[index]
+    return ' '.join(sentences[index] for index in sorted(selected))
@@ -0,0 +1,62 @@
+import asyncio
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one in-flight build.
+
+    The first caller for a key starts the build as a task; every caller that
+    arrives while it is running awaits that same task. A caller being cancelled
+    (e.g. a client disconnecting) does not cancel the build for the others.
+    """
+
+    def __init__(self):
+        self.in_flight = {}
+
+    def start(self, key, build):
+        """Return the in-flight task for key, starting build() as one if there is none"""
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(build())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+        return task
+
+    async def do(self, key, build):
+        return await asyncio.shield(self.start(key, build))
+
+
+class BuildProgress:
+    """Partial results of an in-flight build, replayed from the start to everyone following it.
+
+    The build appends each item as it is ready and calls finish() once it is
+    done, whether it succeeded or not. A follower that joins late first gets
+    everything appended so far, then each new item as it arrives.
+    """
+
+    def __init__(self):
+        self.items = []
+        self.finished = False
+        self.changed = asyncio.Event()
+
+    def append(self, item):
+        self.items.append(item)
+        self._wake()
+
+    def finish(self):
+        self.finished = True
+        self._wake()
+
+    def _wake(self):
+        # Followers wait on the event they saw, so setting it and starting a fresh one wakes exactly them.
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    async def follow(self):
+        index = 0
+        while True:
+            while index < len(self.items):
+                yield self.items[index]
+                index += 1
+            if self.finished:
+                return
+            await self.changed.wait()
@@ -0,0 +1,85 @@
+import importlib
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+ENABLED = os.getenv('STARTUP_PROFILE', '0') == '1'
+REPORT_THRESHOLD = 0.005
+import_timings = {}
+stage_timings = []
+
+
+class TimedLoader:
+    """Wraps a module loader and records how long executing the module took, nested imports included."""
+
+    def __init__(self, loader):
+        self.loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        start_time = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            import_timings[module.__name__] = time.perf_counter() - start_time
+
+
+class ImportTimer:
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = TimedLoader(spec.loader)
+                return spec
+        return None
+
+
+def install():
+    """Start timing every import from here on. Does nothing unless STARTUP_PROFILE=1."""
+    if ENABLED and not any(isinstance(finder, ImportTimer) for finder in sys.meta_path):
+        sys.meta_path.insert(0, ImportTimer())
+
+
+@contextmanager
+def timed(label):
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        if ENABLED:
+            elapsed = time.perf_counter() - start_time
+            stage_timings.append((label, elapsed))
+            print(f"[{datetime.now()}] [startup] {label}: {elapsed * 1000:.1f} ms")
+
+
+def report():
+    if not ENABLED:
+        return
+    print(f"[{datetime.now()}] [startup] Imports over {REPORT_THRESHOLD * 1000:.0f} ms (inclusive of nested imports):")
+    for name, elapsed in sorted(import_timings.items(), key=lambda item: item[1], reverse=True):
+        if elapsed >= REPORT_THRESHOLD and '.' not in name:
+            print(f"    {name:30} {elapsed * 1000:9.1f} ms")
+    for label, elapsed in stage_timings:
+        print(f"    {label:30} {elapsed * 1000:9.1f} ms")
+
+
+if __name__ == '__main__':
+    # python startup_profile.py main  ->  import-time report for main.py
+    os.environ['STARTUP_PROFILE'] = '1'
+    import startup_profile
+    startup_profile.install()
+    for module_name in sys.argv[1:] or ['main']:
+        with startup_profile.timed(f'import {module_name}'):
+            importlib.import_module(module_name)
+    startup_profile.report()
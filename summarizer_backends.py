@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+
+
+SUMMARIZER_BACKEND = os.getenv('SUMMARIZER_BACKEND', 'torch')
+# Exported ONNX graphs are saved here, one directory per model, and reused by every worker and restart
+ONNX_EXPORT_DIR = os.getenv('ONNX_EXPORT_DIR', '.onnx_export')
+
+
+class TorchBackend:
+    """The stock fp32 PyTorch model."""
+
+    name = 'torch'
+
+    def __init__(self, model_name):
+        from transformers import AutoTokenizer
+        from transformers.utils.logging import set_verbosity_error
+        set_verbosity_error()
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = self.load_model(model_name)
+
+    def load_model(self, model_name):
+        from transformers import AutoModelForSeq2SeqLM
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+        model.eval()
+        return model
+
+    def generate(self, input_ids, min_length, max_length, **generate_kwargs):
+        """Summarize one padded batch of token ID lists."""
+        import torch
+        batch = self.tokenizer.pad({'input_ids': input_ids}, return_tensors='pt')
+        with torch.inference_mode():
+            output = self.model.generate(batch['input_ids'], attention_mask=batch['attention_mask'],
+                                         min_length=min_length, max_length=max_length, do_sample=False, **generate_kwargs)
+        return self.tokenizer.batch_decode(output, skip_special_tokens=True)
+
+
+class QuantizedBackend(TorchBackend):
+    """Dynamic int8 quantization of every Linear layer; weights are quantized once at load time."""
+
+    name = 'int8'
+
+    def load_model(self, model_name):
+        import torch
+        model = super().load_model(model_name)
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxBackend(TorchBackend):
+    """The model exported to an ONNX graph and run by ONNX Runtime. Needs optimum[onnxruntime].
+
+    The export runs once and is saved under ONNX_EXPORT_DIR; later loads read the saved graph.
+    """
+
+    name = 'onnx'
+
+    def load_model(self, model_name):
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError as e:
+            raise RuntimeError("SUMMARIZER_BACKEND=onnx needs 'optimum[onnxruntime]' installed") from e
+        export_path = os.path.join(ONNX_EXPORT_DIR, model_name.replace('/', '--'))
+        if not os.path.isdir(export_path):
+            self.export(ORTModelForSeq2SeqLM, model_name, export_path)
+        return ORTModelForSeq2SeqLM.from_pretrained(export_path)
+
+    def export(self, model_class, model_name, export_path):
+        # Exported next to the target and renamed into place, so workers starting together never load a half-written graph.
+        os.makedirs(ONNX_EXPORT_DIR, exist_ok=True)
+        staging_path = tempfile.mkdtemp(dir=ONNX_EXPORT_DIR)
+        try:
+            model_class.from_pretrained(model_name, export=True).save_pretrained(staging_path)
+            try:
+                os.rename(staging_path, export_path)
+            except OSError:
+                # Another worker finished its export first
+                if not os.path.isdir(export_path):
+                    raise
+        finally:
+            shutil.rmtree(staging_path, ignore_errors=True)
+
+
+BACKENDS = {
+    'torch': TorchBackend,
+    'int8': QuantizedBackend,
+    'onnx': OnnxBackend,
+}
+
+
+def load_backend(model_name, name=None):
+    name = name or SUMMARIZER_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown summarizer backend '{name}', expected one of {', '.join(BACKENDS)}")
+    return BACKENDS[name](model_name)
@@ -0,0 +1,186 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ProcessPoolExecutor, ThreadPoolExecutor
+import metrics
+from inference_scheduler import DEFAULT_PRIORITY, INTERACTIVE_RESERVED_SLOTS, PRIORITY_CLASSES, PriorityScheduler
+from input_prep import chunk_sentences, pack_sentences
+from startup_profile import timed
+from summarizer_backends import SUMMARIZER_BACKEND, load_backend
+
+
+MODEL_NAME = os.getenv('SUMMARIZER_MODEL', 'facebook/bart-large-cnn')
+SUMMARIZER_WORKERS = int(os.getenv('SUMMARIZER_WORKERS', '2'))
+# Batches handed to the executor wait in its FIFO queue, so only as many as there are workers are let in
+SUMMARIZER_MAX_PENDING = int(os.getenv('SUMMARIZER_MAX_PENDING', str(SUMMARIZER_WORKERS)))
+SUMMARIZER_TOKEN_BUDGET = int(os.getenv('SUMMARIZER_TOKEN_BUDGET', '1024'))
+SUMMARIZER_CHUNKED = os.getenv('SUMMARIZER_CHUNKED', '0') == '1'
+SUMMARIZER_MAX_CHUNKS = int(os.getenv('SUMMARIZER_MAX_CHUNKS', '4'))
+DISTILLED_MODEL_NAME = os.getenv('SUMMARIZER_DISTILLED_MODEL', 'sshleifer/distilbart-cnn-6-6')
+# Model tiers from best to cheapest: model and extra generate() arguments
+TIERS = {
+    'bart': (MODEL_NAME, {}),
+    'distilbart': (DISTILLED_MODEL_NAME, {}),
+    'greedy': (DISTILLED_MODEL_NAME, {'num_beams': 1}),
+}
+DEFAULT_TIER = 'bart'
+_backends = {}
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_backend(model_name=MODEL_NAME):
+    """Load the configured inference backend for a model once per process and reuse it for every call.
+
+    Workers load the main model when they start; the smaller tier model is
+    loaded the first time a tier needs it.
+    """
+    if model_name not in _backends:
+        with timed(f'load {model_name} ({SUMMARIZER_BACKEND})'):
+            _backends[model_name] = load_backend(model_name)
+    return _backends[model_name]
+
+
+def generate_summaries(input_ids, min_length, max_length, tier=DEFAULT_TIER, timings=None):
+    """Run one padded batch of already-tokenized inputs through the tier's model."""
+    model_name, generate_kwargs = TIERS[tier]
+    start_time = time.perf_counter()
+    try:
+        return get_backend(model_name).generate(input_ids, min_length, max_length, **generate_kwargs)
+    finally:
+        if timings is not None:
+            timings['inference'] = timings.get('inference', 0.0) + time.perf_counter() - start_time
+
+
+def summarize_chunked(article_texts, min_length, max_length, tier=DEFAULT_TIER, timings=None):
+    """Map-reduce summarization: every chunk of every long article runs in one batch, then the chunk summaries are summarized."""
+    tokenizer = get_backend(TIERS[tier][0]).tokenizer
+    chunks = [chunk_sentences(text, tokenizer, SUMMARIZER_TOKEN_BUDGET, SUMMARIZER_MAX_CHUNKS) for text in article_texts]
+    long_chunks = [chunk for article_chunks in chunks if len(article_chunks) > 1 for chunk in article_chunks]
+    chunk_summaries = iter(generate_summaries(long_chunks, min_length // 2, max_length, tier, timings) if long_chunks else [])
+    final_inputs = []
+    for article_chunks in chunks:
+        if len(article_chunks) == 1:
+            final_inputs.append(article_chunks[0])
+        else:
+            combined = ' '.join(next(chunk_summaries) for _ in article_chunks)
+            final_inputs.append(pack_sentences(combined, tokenizer, SUMMARIZER_TOKEN_BUDGET))
+    return generate_summaries(final_inputs, min_length, max_length, tier, timings)
+
+
+def summarize_texts(article_texts, min_length, max_length, tier=DEFAULT_TIER, timings=None):
+    if SUMMARIZER_CHUNKED:
+        return summarize_chunked(article_texts, min_length, max_length, tier, timings)
+    tokenizer = get_backend(TIERS[tier][0]).tokenizer
+    # Whole sentences up to the token budget; the token IDs go straight to the model.
+    input_ids = [pack_sentences(text, tokenizer, SUMMARIZER_TOKEN_BUDGET) for text in article_texts]
+    return generate_summaries(input_ids, min_length, max_length, tier, timings)
+
+
+def summarize_texts_timed(article_texts, min_length, max_length, tier=DEFAULT_TIER):
+    """summarize_texts in a worker, returning the summaries and the seconds spent tokenizing and in the model"""
+    timings = {'inference': 0.0}
+    start_time = time.perf_counter()
+    summaries = summarize_texts(article_texts, min_length, max_length, tier, timings)
+    # Everything outside generate() is sentence splitting, tokenization and packing.
+    timings['tokenize'] = time.perf_counter() - start_time - timings['inference']
+    return summaries, timings
+
+
+class SummarizerPool:
+    """Long-lived worker processes that each hold a loaded model.
+
+    At most max_pending batches, and never more than there are workers, are
+    running at once. Submitting beyond that blocks the caller until the
+    priority scheduler gives it a slot, so interactive batches go ahead of
+    refresh and backfill work. The reserved interactive slots are taken out
+    of the workers rather than added on top: background batches can occupy
+    at most workers - reserved of them, so an interactive batch always finds
+    an idle worker instead of queueing in the executor's FIFO behind them.
+    """
+
+    def __init__(self, max_workers=SUMMARIZER_WORKERS, max_pending=SUMMARIZER_MAX_PENDING, reserved=INTERACTIVE_RESERVED_SLOTS):
+        # Every worker loads the model when it starts, not on its first request.
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, initializer=get_backend)
+        slots = max(1, min(max_pending, max_workers))
+        # A single worker can't hold one back, so there interactive work only gets to jump the queue.
+        reserved = min(reserved, slots - 1)
+        self.scheduler = PriorityScheduler(slots - reserved, reserved)
+        # Each class waits for its slot in its own threads, so a pile of queued refresh batches can't
+        # use up the threads an interactive request needs to even join the queue.
+        self.waiters = {priority: ThreadPoolExecutor(thread_name_prefix=f'summarizer-{priority}') for priority in PRIORITY_CLASSES}
+
+    def submit(self, article_texts, min_length, max_length, tier=DEFAULT_TIER, priority=DEFAULT_PRIORITY):
+        self.scheduler.acquire(priority)
+        metrics.inference_admitted_total.inc(priority=priority)
+        try:
+            worker_future = self.executor.submit(summarize_texts_timed, list(article_texts), min_length, max_length, tier)
+        except Exception:
+            self.scheduler.release()
+            raise
+        # Callers get the summaries alone; the worker's stage timings are recorded here in the parent process.
+        future = Future()
+        future.add_done_callback(lambda _: future.cancelled() and worker_future.cancel())
+
+        def finish(_):
+            self.scheduler.release()
+            if worker_future.cancelled():
+                future.cancel()
+                return
+            if worker_future.exception() is not None:
+                result = worker_future.exception()
+            else:
+                result, timings = worker_future.result()
+                for stage, seconds in timings.items():
+                    metrics.observe_stage(stage, seconds)
+            try:
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+            except InvalidStateError:
+                pass  # the caller cancelled after the batch had already started
+
+        worker_future.add_done_callback(finish)
+        return future
+
+    def summarize(self, article_texts, min_length, max_length, tier=DEFAULT_TIER, priority=DEFAULT_PRIORITY):
+        return self.submit(article_texts, min_length, max_length, tier, priority).result()
+
+    async def summarize_async(self, article_texts, min_length, max_length, tier=DEFAULT_TIER, priority=DEFAULT_PRIORITY):
+        loop = asyncio.get_running_loop()
+        # Waiting for a free slot happens in a thread so backpressure never blocks the event loop.
+        future = await loop.run_in_executor(self.waiters[priority], self.submit, article_texts, min_length, max_length, tier, priority)
+        return await asyncio.wrap_future(future)
+
+    def stats(self):
+        """Queue depth and wait times per priority class"""
+        return self.scheduler.stats()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        for waiters in self.waiters.values():
+            waiters.shutdown(wait=False, cancel_futures=True)
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SummarizerPool()
+        return _pool
+
+
+def inference_stats():
+    """Per-class scheduler stats, empty until the pool has been started"""
+    with _pool_lock:
+        return _pool.stats() if _pool is not None else {}
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
@@ -0,0 +1,59 @@
+import hashlib
+import json
+import time
+
+
+SUMMARY_TTL = 7 * 86400
+MAX_STORED_SUMMARIES = 5000
+
+
+class SummaryStore:
+    """Content-addressed summaries in Redis, so a refresh only summarizes new or changed articles.
+
+    Entries are keyed by the article URL plus a hash of the extracted text and
+    the summary parameters. Every hit slides the entry's TTL forward, and a
+    sorted set of last-access times evicts the least recently used entries once
+    the store holds more than max_entries.
+    """
+
+    def __init__(self, redis_client, model_name, ttl=SUMMARY_TTL, max_entries=MAX_STORED_SUMMARIES, prefix='summary'):
+        self.redis = redis_client
+        self.model_name = model_name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.prefix = prefix
+        self.lru_key = f'{prefix}:lru'
+
+    def key(self, url, text, min_length, max_length):
+        url_hash = hashlib.sha256(url.encode()).hexdigest()[:16]
+        content = f'{self.model_name}\0{min_length}\0{max_length}\0{text}'
+        content_hash = hashlib.sha256(content.encode()).hexdigest()
+        return f'{self.prefix}:{url_hash}:{content_hash}'
+
+    async def get(self, url, text, min_length, max_length):
+        key = self.key(url, text, min_length, max_length)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.expire(key, self.ttl)
+        pipe.zadd(self.lru_key, {key: time.time()}, xx=True)
+        cached, _, _ = await pipe.execute()
+        if cached is None:
+            return None
+        return json.loads(cached)['summary']
+
+    async def put(self, url, text, min_length, max_length, summary):
+        key = self.key(url, text, min_length, max_length)
+        entry = {'url': url, 'model': self.model_name, 'min_length': min_length, 'max_length': max_length, 'summary': summary}
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.set(key, json.dumps(entry), ex=self.ttl)
+        pipe.zadd(self.lru_key, {key: time.time()})
+        pipe.zcard(self.lru_key)
+        _, _, size = await pipe.execute()
+        if size > self.max_entries:
+            await self.evict(size - self.max_entries)
+
+    async def evict(self, count):
+        # Entries whose TTL already expired are still in the index, deleting them again is harmless.
+        evicted = await self.redis.zpopmin(self.lru_key, count)
+        if evicted:
+            await self.redis.delete(*(key for key, _ in evicted))
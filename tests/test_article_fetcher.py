@@ -0,0 +1,50 @@
+import asyncio
+import pytest
+
+article_fetcher = pytest.importorskip('article_fetcher')
+
+
+def test_remaining_downloads_are_cancelled_once_enough_are_accepted():
+    cancelled = []
+
+    async def fetch_one(candidate):
+        try:
+            await asyncio.sleep(candidate / 100)
+        except asyncio.CancelledError:
+            cancelled.append(candidate)
+            raise
+        return f'article {candidate}'
+
+    results = asyncio.run(article_fetcher.fetch_first([1, 2, 30, 40], fetch_one, wanted=2))
+    assert results == ['article 1', 'article 2']
+    assert sorted(cancelled) == [30, 40]
+
+
+def test_results_keep_candidate_order_and_skip_failures():
+    async def fetch_one(candidate):
+        # Later candidates finish first
+        await asyncio.sleep((10 - candidate) / 1000)
+        if candidate == 2:
+            return None
+        if candidate == 3:
+            raise ValueError('bad article')
+        return candidate
+
+    results = asyncio.run(article_fetcher.fetch_first([1, 2, 3, 4, 5], fetch_one, wanted=3))
+    assert results == [1, 4, 5]
+
+
+def test_no_more_than_concurrency_downloads_run_at_once():
+    running, peak = 0, 0
+
+    async def fetch_one(candidate):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return candidate if candidate % 3 == 0 else None
+
+    results = asyncio.run(article_fetcher.fetch_first(range(10), fetch_one, wanted=3, concurrency=2))
+    assert results == [0, 3, 6]
+    assert peak == 2
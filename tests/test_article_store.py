@@ -0,0 +1,58 @@
+import asyncio
+import pytest
+from article_store import ArticleStore, decode_cursor
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+def articles(count, minute=0):
+    return [{'title': f'T{index}', 'summary': f'S{index}', 'author': None, 'source': 'src', 'url': f'http://a/{index}',
+             'published_at': f'2026-10-18T10:{minute + index // 2:02d}:00Z', 'tier': 'bart'} for index in range(count)]
+
+
+def run(scenario, **options):
+    async def wrapper():
+        redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        try:
+            return await scenario(ArticleStore(redis_client, **options))
+        finally:
+            await redis_client.aclose()
+    return asyncio.run(wrapper())
+
+
+def test_pages_cover_every_article_once_newest_first():
+    async def scenario(store):
+        await store.index('science', articles(25))
+        titles, cursor = [], None
+        while True:
+            page, cursor = await store.page('science', cursor, limit=7, fields=['title', 'published_at'])
+            titles += [article['title'] for article in page]
+            if cursor is None:
+                return titles
+
+    titles = run(scenario)
+    assert sorted(titles) == sorted(f'T{index}' for index in range(25))
+    assert titles[0] in ('T24', 'T23')
+
+
+def test_projection_and_nullable_fields():
+    async def scenario(store):
+        await store.index('science', articles(1))
+        return await store.page('science', fields=['title', 'author'])
+
+    page, cursor = run(scenario)
+    assert page == [{'id': page[0]['id'], 'title': 'T0', 'author': None}] and cursor is None
+
+
+def test_index_keeps_only_the_newest_entries():
+    async def scenario(store):
+        await store.index('science', articles(10))
+        page, _ = await store.page('science', limit=100)
+        return page
+
+    assert len(run(scenario, index_max=4)) == 4
+
+
+def test_malformed_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor('nonsense')
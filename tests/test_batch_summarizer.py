@@ -0,0 +1,33 @@
+import asyncio
+import threading
+import pytest
+from batch_summarizer import BatchSummarizer
+
+
+def test_callers_get_their_own_summary():
+    async def run():
+        batcher = BatchSummarizer(lambda texts: [text.upper() for text in texts], max_wait=0.01)
+        summaries = await asyncio.gather(*(batcher.summarize(text) for text in ['a', 'b', 'c']))
+        await batcher.close()
+        return summaries
+
+    assert asyncio.run(run()) == ['A', 'B', 'C']
+
+
+def test_close_fails_waiting_callers():
+    release = threading.Event()
+
+    def slow_batch(texts):
+        release.wait(5)
+        return texts
+
+    async def run():
+        batcher = BatchSummarizer(slow_batch, max_batch_size=1, max_concurrent_batches=1)
+        callers = [asyncio.create_task(batcher.summarize(text)) for text in ['running', 'queued']]
+        await asyncio.sleep(0.05)
+        await batcher.close()
+        release.set()
+        return await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), timeout=1)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
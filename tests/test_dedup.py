@@ -0,0 +1,61 @@
+import asyncio
+import numpy as np
+from dedup import NearDuplicateIndex, SharedSummaries, minhash_signature
+
+
+STORY = ('The central bank raised interest rates by a quarter point on Wednesday, citing persistent inflation '
+         'in housing and services, and signalled that further increases remain possible this year.')
+REWRITE = STORY.replace('on Wednesday', 'on Wednesday afternoon')
+OTHER = 'The home team won the championship after a dramatic overtime goal in front of a sold-out crowd.'
+
+
+def test_signature_is_deterministic():
+    assert np.array_equal(minhash_signature(STORY), minhash_signature(STORY))
+    assert minhash_signature(STORY).shape == (64,)
+
+
+def test_index_finds_near_duplicates_only():
+    index = NearDuplicateIndex()
+    index.add('story', minhash_signature(STORY))
+    assert index.find(minhash_signature(REWRITE)) == 'story'
+    assert index.find(minhash_signature(OTHER)) is None
+
+
+def test_near_duplicates_are_summarized_once():
+    calls = []
+
+    async def summarize(data):
+        calls.append(data['url'])
+        await asyncio.sleep(0.01)
+        return f"summary of {data['url']}"
+
+    async def run():
+        shared = SharedSummaries()
+        return await asyncio.gather(
+            shared.summarize({'url': 'a', 'text': STORY}, summarize),
+            shared.summarize({'url': 'b', 'text': REWRITE}, summarize),
+            shared.summarize({'url': 'c', 'text': OTHER}, summarize),
+        )
+
+    assert asyncio.run(run()) == ['summary of a', 'summary of a', 'summary of c']
+    assert calls == ['a', 'c']
+
+
+def test_duplicate_of_a_failed_summary_is_summarized_itself():
+    async def summarize(data):
+        await asyncio.sleep(0)
+        if data['url'] == 'a':
+            raise RuntimeError('model failed')
+        return 'own summary'
+
+    async def run():
+        shared = SharedSummaries()
+        return await asyncio.gather(
+            shared.summarize({'url': 'a', 'text': STORY}, summarize),
+            shared.summarize({'url': 'b', 'text': REWRITE}, summarize),
+            return_exceptions=True,
+        )
+
+    first, second = asyncio.run(run())
+    assert isinstance(first, RuntimeError)
+    assert second == 'own summary'
@@ -0,0 +1,41 @@
+import pytest
+from html_extractor import BeautifulSoupExtractor, ParagraphParser, StreamingExtractor
+
+
+def paragraphs(html):
+    parser = ParagraphParser()
+    parser.feed(html)
+    parser.close()
+    return parser.paragraphs
+
+
+def test_unclosed_paragraphs_are_kept():
+    assert paragraphs('<p>one<p>two</p><p>three') == ['one', 'two', 'three']
+
+
+def test_scripts_and_styles_are_skipped():
+    assert paragraphs('<p>keep<script>var x = 1;</script> this</p><style>p {}</style>') == ['keep this']
+
+
+def test_text_outside_paragraphs_is_ignored():
+    assert paragraphs('<div>menu</div><p>body <b>bold</b></p>footer') == ['body bold']
+
+
+@pytest.mark.parametrize('html', [
+    '<html><body><p>first &amp; second</p><div><p>nested <i>text</i></p></div></body></html>',
+    '<p>one</p><script>skip()</script><p>two <a href="#">link</a></p>',
+])
+def test_matches_beautifulsoup_on_well_formed_pages(html):
+    extractors = [StreamingExtractor(), BeautifulSoupExtractor()]
+    for extractor in extractors:
+        # Split mid-tag to exercise incremental parsing
+        extractor.feed(html[:7])
+        extractor.feed(html[7:])
+    assert extractors[0].text() == extractors[1].text()
+
+
+def test_stops_at_word_target():
+    extractor = StreamingExtractor(word_target=3)
+    assert not extractor.feed('<p>one two</p>')
+    assert extractor.feed('<p>three four</p>')
+    assert extractor.text() == 'one two three four'
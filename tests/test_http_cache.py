@@ -0,0 +1,118 @@
+import asyncio
+import os
+import pytest
+from http_cache import ArticleCache, cache_lifetime
+
+article_fetcher = pytest.importorskip('article_fetcher')
+
+VALIDATED = {'ETag': '"v1"', 'Cache-Control': 'max-age=0'}
+
+
+def disk_bytes(directory):
+    return sum(entry.stat().st_size for entry in os.scandir(directory))
+
+
+@pytest.mark.parametrize('cache_control, lifetime', [
+    ('max-age=60', 60), ('public, max-age=5', 5), ('no-cache', 0), ('no-store', None), ('', 0),
+])
+def test_cache_lifetime(cache_control, lifetime):
+    assert cache_lifetime({'Cache-Control': cache_control}) == lifetime
+
+
+def test_responses_without_validators_or_lifetime_are_not_stored(tmp_path):
+    cache = ArticleCache(tmp_path)
+    assert not cache.put('http://a/1', 'stream', {}, 'text')
+    assert not cache.put('http://a/1', 'stream', {'ETag': '"x"', 'Cache-Control': 'no-store'}, 'text')
+    assert cache.put('http://a/1', 'stream', VALIDATED, 'text')
+    assert cache.get('http://a/1', 'stream')['text'] == 'text'
+    assert cache.conditional_headers(cache.get('http://a/1', 'stream')) == {'If-None-Match': '"v1"'}
+
+
+def test_rewrites_do_not_inflate_the_byte_count(tmp_path):
+    cache = ArticleCache(tmp_path)
+    cache.put('http://a/1', 'stream', VALIDATED, 'first text')
+    cache.put('http://a/2', 'stream', VALIDATED, 'second text')
+    entry = cache.get('http://a/1', 'stream')
+    for _ in range(20):
+        cache.refresh('http://a/1', 'stream', entry, {'Cache-Control': 'max-age=60'})
+    cache.put('http://a/2', 'stream', VALIDATED, 'second text, changed')
+    assert cache.total_bytes == disk_bytes(tmp_path)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ArticleCache(tmp_path)
+    for index in range(3):
+        cache.put(f'http://a/{index}', 'stream', VALIDATED, 'x' * 100)
+        os.utime(cache.path(f'http://a/{index}', 'stream'), (1000 + index, 1000 + index))
+    cache.max_bytes = disk_bytes(tmp_path) - 1
+    cache.put('http://a/3', 'stream', VALIDATED, 'x' * 100)
+    assert cache.get('http://a/0', 'stream') is None
+    assert cache.get('http://a/3', 'stream') is not None
+    assert cache.total_bytes == disk_bytes(tmp_path) <= cache.max_bytes
+
+
+class FakeContent:
+    def __init__(self, body):
+        self.body = body
+
+    async def iter_chunked(self, size):
+        if self.body:
+            yield self.body
+
+
+class FakeResponse:
+    charset = 'utf-8'
+
+    def __init__(self, status, body=b'', headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self.content = FakeContent(body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append(headers or {})
+        return self.responses.pop(0)
+
+
+def fetch(session, tmp_path, monkeypatch):
+    cache = ArticleCache(tmp_path)
+    monkeypatch.setattr(article_fetcher, 'get_article_cache', lambda: cache)
+    return asyncio.run(article_fetcher.fetch_article_text(session, 'http://a/1')), cache
+
+
+def test_304_is_served_from_the_cache(tmp_path, monkeypatch):
+    ArticleCache(tmp_path).put('http://a/1', article_fetcher.EXTRACTOR, VALIDATED, 'cached text')
+    session = FakeSession(FakeResponse(304, headers={'Cache-Control': 'max-age=0'}))
+    text, cache = fetch(session, tmp_path, monkeypatch)
+    assert text == 'cached text'
+    assert session.requests == [{'If-None-Match': '"v1"'}]
+    assert cache.total_bytes is None or cache.total_bytes == disk_bytes(tmp_path)
+
+
+def test_304_without_a_cached_entry_is_retried_unconditionally(tmp_path, monkeypatch):
+    session = FakeSession(FakeResponse(304), FakeResponse(200, b'<p>fresh text</p>', VALIDATED))
+    text, cache = fetch(session, tmp_path, monkeypatch)
+    assert text == 'fresh text'
+    assert len(session.requests) == 2 and 'If-None-Match' not in session.requests[1]
+    assert cache.get('http://a/1', article_fetcher.EXTRACTOR)['text'] == 'fresh text'
+
+
+def test_stats_count_lookups_and_hit_rate_per_host(tmp_path):
+    cache = ArticleCache(tmp_path)
+    for result in ('fresh', 'revalidated', 'miss', 'changed'):
+        cache.record('http://a.example/1', result)
+    cache.record('http://b.example/1', 'miss')
+    stats = cache.stats()
+    assert stats['a.example']['lookups'] == 4 and stats['a.example']['hit_rate'] == 0.5
+    assert stats['b.example']['lookups'] == 1 and stats['b.example']['hit_rate'] == 0.0
@@ -0,0 +1,76 @@
+import threading
+import time
+import pytest
+from inference_scheduler import PriorityScheduler
+
+
+def acquire_in_thread(scheduler, priority, admitted):
+    def run():
+        scheduler.acquire(priority)
+        admitted.append(priority)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def wait_for(condition, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_reserved_slot_admits_interactive_only():
+    scheduler = PriorityScheduler(capacity=1, reserved=1)
+    scheduler.acquire('refresh')
+    admitted = []
+    acquire_in_thread(scheduler, 'refresh', admitted)
+    acquire_in_thread(scheduler, 'interactive', admitted)
+    assert wait_for(lambda: admitted == ['interactive'])
+    # The interactive batch still holds a slot, so the refresh waits for both to finish.
+    scheduler.release()
+    time.sleep(0.05)
+    assert admitted == ['interactive']
+    scheduler.release()
+    assert wait_for(lambda: admitted == ['interactive', 'refresh'])
+
+
+def test_higher_class_goes_first_when_a_slot_frees():
+    scheduler = PriorityScheduler(capacity=1, reserved=0)
+    scheduler.acquire('refresh')
+    admitted = []
+    acquire_in_thread(scheduler, 'backfill', admitted)
+    assert wait_for(lambda: scheduler.stats()['backfill']['depth'] == 1)
+    acquire_in_thread(scheduler, 'refresh', admitted)
+    assert wait_for(lambda: scheduler.stats()['refresh']['depth'] == 1)
+    scheduler.release()
+    assert wait_for(lambda: admitted == ['refresh'])
+    scheduler.release()
+    assert wait_for(lambda: admitted == ['refresh', 'backfill'])
+
+
+def test_aging_lets_long_waiters_ahead():
+    scheduler = PriorityScheduler(capacity=1, reserved=0, aging=0.05)
+    scheduler.acquire('refresh')
+    admitted = []
+    acquire_in_thread(scheduler, 'backfill', admitted)
+    time.sleep(0.2)
+    acquire_in_thread(scheduler, 'interactive', admitted)
+    assert wait_for(lambda: scheduler.stats()['interactive']['depth'] == 1)
+    scheduler.release()
+    assert wait_for(lambda: admitted == ['backfill'])
+
+
+def test_unknown_priority_is_rejected():
+    with pytest.raises(ValueError):
+        PriorityScheduler(capacity=1).acquire('urgent')
+
+
+@pytest.mark.parametrize('workers, reserved, expected', [(2, 1, (1, 1)), (4, 1, (3, 1)), (1, 1, (1, 0))])
+def test_pool_keeps_reserved_workers_free_of_background_batches(workers, reserved, expected):
+    summarizer_pool = pytest.importorskip('summarizer_pool')
+    pool = summarizer_pool.SummarizerPool(max_workers=workers, max_pending=workers, reserved=reserved)
+    try:
+        assert (pool.scheduler.capacity, pool.scheduler.reserved) == expected
+    finally:
+        pool.shutdown()
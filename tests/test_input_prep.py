@@ -0,0 +1,69 @@
+from input_prep import add_special_tokens, chunk_sentences, pack_encoded, pack_sentences, split_sentences
+
+BOS, EOS = 0, 2
+
+
+class StubTokenizer:
+    """One token per word, wrapped in BOS ... EOS like BART"""
+
+    def __init__(self, prefix=(BOS,), suffix=(EOS,)):
+        self.prefix = list(prefix)
+        self.suffix = list(suffix)
+        self.vocab = {}
+
+    def encode(self, text, add_special_tokens):
+        ids = [self.vocab.setdefault(word, len(self.vocab) + 10) for word in text.split()]
+        return self.prefix + ids + self.suffix if add_special_tokens else ids
+
+    def __call__(self, text, add_special_tokens=True):
+        if isinstance(text, list):
+            return {'input_ids': [self.encode(item, add_special_tokens) for item in text]}
+        return {'input_ids': self.encode(text, add_special_tokens)}
+
+    def num_special_tokens_to_add(self):
+        return len(self.prefix) + len(self.suffix)
+
+
+def words(count, start=0):
+    return ' '.join(f'w{index}' for index in range(start, start + count)) + '.'
+
+
+def test_split_sentences_keeps_leading_spaces():
+    assert split_sentences(' One. Two!  Three? ') == ['One.', ' Two!', ' Three?']
+
+
+def test_add_special_tokens_learns_the_template():
+    assert add_special_tokens([7, 8], StubTokenizer()) == [BOS, 7, 8, EOS]
+    assert add_special_tokens([7, 8], StubTokenizer(prefix=(), suffix=(EOS,))) == [7, 8, EOS]
+    assert add_special_tokens([7, 8], StubTokenizer(prefix=(), suffix=())) == [7, 8]
+
+
+def test_pack_encoded_stops_at_the_last_whole_sentence():
+    tokenizer = StubTokenizer()
+    packed = pack_encoded([[11, 12, 13], [14, 15], [16, 17, 18]], tokenizer, budget=8)
+    assert packed == [BOS, 11, 12, 13, 14, 15, EOS]
+
+
+def test_a_first_sentence_longer_than_the_budget_is_cut():
+    tokenizer = StubTokenizer()
+    packed = pack_sentences(words(20) + ' ' + words(2, start=20), tokenizer, budget=6)
+    assert len(packed) == 6
+    assert packed[0] == BOS and packed[-1] == EOS
+    assert packed[1:-1] == tokenizer(words(20), add_special_tokens=False)['input_ids'][:4]
+
+
+def test_chunk_sentences_splits_on_sentence_boundaries():
+    tokenizer = StubTokenizer()
+    text = ' '.join(words(3, start=start) for start in (0, 3, 6, 9))
+    chunks = chunk_sentences(text, tokenizer, budget=8, max_chunks=5)
+    # Two 3-word sentences fit in a chunk's 6-token body
+    assert [len(chunk) for chunk in chunks] == [8, 8]
+    assert all(chunk[0] == BOS and chunk[-1] == EOS for chunk in chunks)
+    assert chunks[0][1:-1] + chunks[1][1:-1] == tokenizer(text, add_special_tokens=False)['input_ids']
+
+
+def test_chunk_sentences_respects_max_chunks_and_empty_text():
+    tokenizer = StubTokenizer()
+    text = ' '.join(words(3, start=start) for start in (0, 3, 6, 9))
+    assert len(chunk_sentences(text, tokenizer, budget=5, max_chunks=2)) == 2
+    assert chunk_sentences('', tokenizer, budget=8, max_chunks=2) == [[BOS, EOS]]
@@ -0,0 +1,47 @@
+from l1_cache import L1Cache
+
+
+def test_get_returns_what_was_set():
+    cache = L1Cache()
+    cache.set('science', b'payload', cache.version)
+    assert cache.get('science') == b'payload'
+    assert cache.get('sports') is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = L1Cache(max_entries=2)
+    cache.set('a', 1, cache.version)
+    cache.set('b', 2, cache.version)
+    cache.get('a')
+    cache.set('c', 3, cache.version)
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+
+
+def test_entries_expire(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr('l1_cache.time.monotonic', lambda: now[0])
+    cache = L1Cache(ttl=10)
+    cache.set('a', 1, cache.version)
+    now[0] += 11
+    assert cache.get('a') is None
+    assert 'a' not in cache.entries
+
+
+def test_invalidate_one_key_or_all():
+    cache = L1Cache()
+    cache.set('a', 1, cache.version)
+    cache.set('b', 2, cache.version)
+    cache.invalidate('a')
+    assert cache.get('a') is None and cache.get('b') == 2
+    cache.invalidate()
+    assert cache.get('b') is None
+
+
+def test_read_that_raced_an_invalidation_is_not_cached():
+    cache = L1Cache()
+    version = cache.version
+    cache.invalidate('a')
+    cache.set('a', b'stale', version)
+    assert cache.get('a') is None
@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from leases import Lease, LeaseKeeper, LeaseLost
+from news_payloads import encode_payload
+from news_snapshots import SnapshotStore
+
+fakeredis = pytest.importorskip('fakeredis')
+pytest.importorskip('lupa')
+
+
+def run(scenario):
+    async def wrapper():
+        server = fakeredis.FakeServer()
+        redis_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        redis_raw = fakeredis.FakeAsyncRedis(server=server)
+        try:
+            return await scenario(redis_client, redis_raw)
+        finally:
+            await redis_client.aclose()
+            await redis_raw.aclose()
+    return asyncio.run(wrapper())
+
+
+def test_only_one_owner_until_the_ttl_lapses():
+    async def scenario(redis_client, redis_raw):
+        first = Lease(redis_client, 'science', owner='first', ttl_ms=50)
+        second = Lease(redis_client, 'science', owner='second', ttl_ms=50)
+        assert await first.acquire()
+        assert not await second.acquire()
+        await asyncio.sleep(0.1)
+        assert await second.acquire()
+        # Every new term gets a newer fencing token
+        assert second.token > first.token
+    run(scenario)
+
+
+def test_renew_after_losing_the_lease_gives_it_up():
+    async def scenario(redis_client, redis_raw):
+        first = Lease(redis_client, 'science', owner='first', ttl_ms=50)
+        second = Lease(redis_client, 'science', owner='second', ttl_ms=50)
+        await first.acquire()
+        await asyncio.sleep(0.1)
+        await second.acquire()
+        assert not await first.renew()
+        assert not first.held and first.fence() is None
+        # Releasing a lost lease leaves the new owner's alone
+        await first.release()
+        assert await second.renew()
+    run(scenario)
+
+
+def test_keeper_renews_its_own_leases_and_takes_over_lapsed_ones():
+    async def scenario(redis_client, redis_raw):
+        first = LeaseKeeper(redis_client, ['science', 'sports'], owner='first', ttl_ms=50)
+        second = LeaseKeeper(redis_client, ['science', 'sports'], owner='second', ttl_ms=50)
+        acquired = []
+        await first.maintain_once()
+        await second.maintain_once(acquired.append)
+        assert first.owned() == ['science', 'sports'] and second.owned() == [] and acquired == []
+        await asyncio.sleep(0.1)
+        await second.maintain_once(acquired.append)
+        await first.maintain_once()
+        assert first.owned() == [] and second.owned() == ['science', 'sports'] and acquired == ['science', 'sports']
+    run(scenario)
+
+
+def test_publishing_with_a_stale_fence_raises_lease_lost():
+    async def scenario(redis_client, redis_raw):
+        store = SnapshotStore(redis_raw)
+        first = Lease(redis_client, 'science', owner='first', ttl_ms=50)
+        second = Lease(redis_client, 'science', owner='second', ttl_ms=50)
+        await first.acquire()
+        stale_fence = first.fence()
+        await asyncio.sleep(0.1)
+        await second.acquire()
+        with pytest.raises(LeaseLost):
+            await store.publish({'science': encode_payload({'science': [1]})}, [stale_fence])
+        assert await store.current_generation() is None
+        assert await store.publish({'science': encode_payload({'science': [2]})}, [second.fence()]) is not None
+    run(scenario)
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import pytest
+from article_store import ArticleStore
+from news_payloads import encode_payload
+from news_snapshots import SnapshotStore
+from search_index import SearchIndex
+
+fakeredis = pytest.importorskip('fakeredis')
+testclient = pytest.importorskip('fastapi.testclient')
+main = pytest.importorskip('main')
+
+ARTICLES = [{'title': 'T', 'summary': 'S', 'author': 'a', 'source': 's', 'image': None, 'url': 'http://a/1', 'tier': 'bart'}]
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    """A client for the app, without the lifespan, over an empty fake Redis"""
+    server = fakeredis.FakeServer()
+    main.app.state.redis = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    main.app.state.redis_raw = fakeredis.FakeAsyncRedis(server=server)
+    main.app.state.snapshots = SnapshotStore(main.app.state.redis_raw)
+    main.app.state.articles = ArticleStore(main.app.state.redis)
+    main.l1_cache.invalidate()
+    monkeypatch.setattr(main, 'search_index', SearchIndex())
+    monkeypatch.setattr(main, 'SNAPSHOT_PATH', str(tmp_path / 'snapshot.json'))
+
+    async def no_cache_miss_builds(redis_raw, category):
+        raise AssertionError(f'{category} should have been served from the cache')
+    monkeypatch.setattr(main, 'fill_cache_miss', no_cache_miss_builds)
+    yield testclient.TestClient(main.app)
+    main.l1_cache.invalidate()
+
+
+def publish(cache_key):
+    async def scenario():
+        redis_raw = main.app.state.redis_raw
+        await SnapshotStore(redis_raw).publish({cache_key: encode_payload({cache_key: ARTICLES})})
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('path, cache_key', [
+    ('/news', main.HEADLINES_KEY), ('/news/default', main.HEADLINES_KEY), ('/news/science', 'science'),
+])
+def test_categories_are_served_from_the_cache(client, path, cache_key):
+    publish(cache_key)
+    response = client.get(path)
+    assert response.status_code == 200
+    assert json.loads(response.content) == {cache_key: ARTICLES}
+    assert client.get(path, headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+
+def test_cached_only_requests_get_no_content_on_a_miss(client):
+    response = client.get('/news/science', headers={'X-Cached-Only': '1'})
+    assert response.status_code == 204
+
+
+def sse_events(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def test_a_streamed_miss_sends_each_article_then_publishes_the_category(client, monkeypatch):
+    listing = {title: {'text': title, 'author': None, 'source': 's', 'image': None, 'url': f'http://a/{title}'} for title in 'AB'}
+
+    async def get_article_contents(category):
+        return listing
+
+    async def stream_summaries(articles, summary_store=None):
+        # Finish in the reverse of listing order
+        for title in reversed(list(articles)):
+            yield dict(ARTICLES[0], title=title, url=articles[title]['url'])
+
+    monkeypatch.setattr(main, 'get_article_contents', get_article_contents)
+    monkeypatch.setattr(main, 'stream_summaries', stream_summaries)
+    events = sse_events(client.get('/news/science/stream').text)
+    assert [event for event, _ in events] == ['start', 'article', 'article', 'payload', 'done']
+    assert [data['title'] for event, data in events if event == 'article'] == ['B', 'A']
+    assert [article['title'] for article in events[3][1]['science']] == ['A', 'B']
+    assert events[-1][1] == {'category': 'science', 'cached': False}
+    assert main.article_streams == {}
+    assert [article['title'] for article in client.get('/news/science').json()['science']] == ['A', 'B']
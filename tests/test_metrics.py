@@ -0,0 +1,53 @@
+import asyncio
+import metrics
+from metrics import Counter, Histogram, RequestMetricsMiddleware, format_labels
+
+
+def test_label_values_are_escaped():
+    assert format_labels(('host', 'path'), ('a"b', 'c\\d\ne')) == '{host="a\\"b",path="c\\\\d\\ne"}'
+
+
+def test_counter_renders_as_counter():
+    counter = Counter('test_things_total', 'Things\ncounted', ['kind'])
+    counter.inc(kind='a')
+    counter.inc(2, kind='a')
+    assert counter.render() == ['# HELP test_things_total Things\\ncounted', '# TYPE test_things_total counter',
+                                'test_things_total{kind="a"} 3']
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram('test_seconds', 'Seconds', buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value)
+    assert histogram.render()[2:] == ['test_seconds_bucket{le="0.1"} 1', 'test_seconds_bucket{le="1"} 2',
+                                      'test_seconds_bucket{le="+Inf"} 3', 'test_seconds_sum 5.55', 'test_seconds_count 3']
+
+
+def test_inference_admitted_is_a_counter():
+    assert '# TYPE news_inference_admitted_total counter' in metrics.render()
+
+
+def test_middleware_times_each_route_and_passes_the_body_through():
+    class Route:
+        path = '/news/{category}/stream'
+
+    async def app(scope, receive, send):
+        scope['route'] = Route()
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        for chunk in (b'event: a\n\n', b'event: b\n\n'):
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {'type': 'http.request'}
+
+    key = ('/news/{category}/stream', '200')
+    before = metrics.request_seconds.series.get(key, [None, 0.0, 0])[2]
+    asyncio.run(RequestMetricsMiddleware(app)({'type': 'http'}, receive, send))
+    assert metrics.request_seconds.series[key][2] == before + 1
+    assert [message.get('body') for message in sent[1:]] == [b'event: a\n\n', b'event: b\n\n', b'']
@@ -0,0 +1,44 @@
+import pytest
+from news_payloads import choose_encoding, encode_payload, etag_matches, parse_accept_encoding
+
+
+PAYLOAD = {'identity': b'{}', 'gzip': b'', 'br': b''}
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip, deflate, br', 'br'),
+    ('gzip, br;q=0', 'gzip'),
+    ('br;q=0, gzip;q=0', 'identity'),
+    ('gzip;q=0.5', 'gzip'),
+    ('*', 'br'),
+    ('*;q=0, gzip', 'gzip'),
+    ('', 'identity'),
+])
+def test_choose_encoding_honours_q_values(header, expected):
+    assert choose_encoding(header, PAYLOAD) == expected
+
+
+def test_brotli_needs_a_stored_variant():
+    assert choose_encoding('br, gzip', {'identity': b'{}', 'gzip': b''}) == 'gzip'
+
+
+def test_malformed_q_value_is_not_acceptable():
+    assert parse_accept_encoding('br;q=high, gzip') == {'br': 0.0, 'gzip': 1.0}
+
+
+@pytest.mark.parametrize('header, matches', [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", W/"abc"', True),
+    ('*', True),
+    ('"abcd"', False),
+    ('"ab"', False),
+    ('', False),
+])
+def test_etag_matches_exact_values(header, matches):
+    assert etag_matches(header, '"abc"') is matches
+
+
+def test_encode_payload_etag_is_quoted():
+    etag = encode_payload({'a': 1})['etag'].decode()
+    assert etag.startswith('"') and etag.endswith('"')
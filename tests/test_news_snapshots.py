@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from news_payloads import encode_payload
+from news_snapshots import CURRENT_MANIFEST_KEY, GENERATIONS_KEY, SnapshotStore, manifest_key
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+def run(coroutine_function):
+    async def wrapper():
+        redis_raw = fakeredis.FakeAsyncRedis()
+        try:
+            return await coroutine_function(SnapshotStore(redis_raw, keep_generations=2), redis_raw)
+        finally:
+            await redis_raw.aclose()
+    return asyncio.run(wrapper())
+
+
+def test_publish_and_load():
+    async def scenario(store, redis_raw):
+        payload = encode_payload({'science': [1]})
+        generation = await store.publish({'science': payload})
+        assert await store.current_generation() == generation
+        assert (await store.load('science'))['identity'] == payload['identity']
+        assert await store.load('sports') is None
+    run(scenario)
+
+
+def test_partial_publish_carries_other_keys_over():
+    async def scenario(store, redis_raw):
+        science = encode_payload({'science': [1]})
+        await store.publish({'science': science, 'sports': encode_payload({'sports': [1]})})
+        sports = encode_payload({'sports': [2]})
+        await store.publish({'sports': sports, 'science': None})
+        loaded = await store.load_all()
+        assert loaded['science']['identity'] == science['identity']
+        assert loaded['sports']['identity'] == sports['identity']
+    run(scenario)
+
+
+def test_nothing_to_publish_keeps_the_snapshot():
+    async def scenario(store, redis_raw):
+        assert await store.publish({'science': None}) is None
+        assert await store.current_generation() is None
+    run(scenario)
+
+
+def test_old_manifests_are_collected_and_kept_ones_expire():
+    async def scenario(store, redis_raw):
+        generations = [await store.publish({'science': encode_payload({'science': [n]})}) for n in range(4)]
+        assert len(await redis_raw.lrange(GENERATIONS_KEY, 0, -1)) == 2
+        assert not await redis_raw.exists(manifest_key(generations[0]))
+        assert await redis_raw.ttl(manifest_key(generations[-1])) > 0
+        assert await redis_raw.hget(CURRENT_MANIFEST_KEY, 'science') is not None
+    run(scenario)
+
+
+def test_rollback_restores_the_previous_generation():
+    async def scenario(store, redis_raw):
+        assert await store.rollback() is None
+        first = encode_payload({'science': [1]})
+        previous = await store.publish({'science': first})
+        latest = await store.publish({'science': encode_payload({'science': [2]}), 'sports': encode_payload({'sports': [1]})})
+        assert await store.rollback() == previous
+        assert await store.current_generation() == previous
+        assert (await store.load('science'))['identity'] == first['identity']
+        assert await store.load('sports') is None
+        assert not await redis_raw.exists(manifest_key(latest))
+        # Only one generation is left to go back to
+        assert await store.rollback() is None
+    run(scenario)
@@ -0,0 +1,76 @@
+import pytest
+import refresh_planner
+from refresh_planner import RefreshPlanner, listing_fingerprint
+
+
+CATEGORIES = ['business', 'sports', 'science']
+
+
+def listing(*urls):
+    return {'articles': [{'url': url} for url in urls]}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(refresh_planner.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def planner():
+    return RefreshPlanner(CATEGORIES, base_interval=3600, min_interval=900, max_interval=14400)
+
+
+def test_fingerprint_ignores_order_and_missing_urls():
+    assert listing_fingerprint(listing('a', 'b')) == listing_fingerprint({'articles': [{'url': 'b'}, {'url': None}, {'url': 'a'}]})
+    assert listing_fingerprint(listing('a')) != listing_fingerprint(listing('a', 'b'))
+
+
+def test_offsets_spread_across_the_base_interval():
+    assert [planner().offset(category) for category in CATEGORIES] == [1200, 2400, 3600]
+
+
+def test_changed_only_reflects_recorded_listings():
+    plan = planner()
+    assert plan.changed('sports', listing('a'))
+    # A check that failed before publishing is never recorded, so the next one still sees a change.
+    assert plan.changed('sports', listing('a'))
+    plan.record('sports', listing('a'))
+    assert not plan.changed('sports', listing('a'))
+    assert plan.changed('sports', listing('a', 'b'))
+
+
+def test_first_record_keeps_the_prior_rate(clock):
+    plan = planner()
+    plan.record('sports', listing('a'))
+    assert plan.change_rates['sports'] == pytest.approx(1 / 3600)
+
+
+def test_changes_raise_the_rate_and_shorten_the_interval(clock):
+    plan = planner()
+    for category in CATEGORIES:
+        plan.record(category, listing(category))
+    for step in range(5):
+        clock[0] += 1800
+        plan.record('sports', listing(f'sports-{step}'))
+        plan.record('science', listing('science'))
+    assert plan.change_rates['sports'] > 1 / 3600 > plan.change_rates['science']
+    assert plan.interval('sports') < plan.interval('business') < plan.interval('science')
+
+
+def test_back_to_back_checks_count_as_min_interval(clock):
+    plan = planner()
+    plan.record('sports', listing('a'))
+    clock[0] += 1
+    plan.record('sports', listing('b'))
+    assert plan.change_rates['sports'] == pytest.approx(0.7 / 3600 + 0.3 / 900)
+
+
+def test_intervals_stay_within_bounds(clock):
+    plan = planner()
+    plan.change_rates = {'business': 0.0, 'sports': 1.0, 'science': 0.0}
+    # Every check in the budget goes to the only category that changes
+    assert plan.interval('sports') == 1200
+    assert plan.interval('business') == 14400
+    plan.change_rates = dict.fromkeys(CATEGORIES, 0.0)
+    assert plan.interval('sports') == 3600
@@ -0,0 +1,68 @@
+from search_index import SearchIndex, tokenize
+
+
+def article(title, summary='', url=None, tier='bart', source='Wire', author=None):
+    return {'title': title, 'summary': summary, 'url': url or title, 'tier': tier, 'source': source, 'author': author}
+
+
+def titles(results):
+    return [result['title'] for _, result in results]
+
+
+def test_tokenize_lowercases_and_drops_stopwords():
+    assert tokenize('The Rover, on Mars!') == ['rover', 'mars']
+
+
+def test_title_matches_rank_above_summary_matches():
+    index = SearchIndex()
+    index.index('science', [article('Budget vote delayed', 'Lawmakers mention Mars funding.'), article('Mars rover lands')])
+    assert titles(index.search('mars')) == ['Mars rover lands', 'Budget vote delayed']
+
+
+def test_rare_terms_weigh_more():
+    index = SearchIndex()
+    index.index('business', [article('Stocks rise on earnings'), article('Stocks fall on tariffs'), article('Oil rises')])
+    assert titles(index.search('stocks tariffs'))[0] == 'Stocks fall on tariffs'
+
+
+def test_republishing_unchanged_articles_is_a_no_op():
+    index = SearchIndex()
+    index.index('science', [article('Mars rover lands')])
+    next_doc = index.next_doc
+    index.index('science', [article('Mars rover lands')])
+    assert index.next_doc == next_doc and len(index) == 1
+
+
+def test_upgraded_summary_replaces_the_old_document():
+    index = SearchIndex()
+    index.index('science', [article('Rover lands', 'quick extractive text', url='u', tier='extractive')])
+    index.index('science', [article('Rover lands', 'model written summary', url='u')])
+    assert len(index) == 1
+    assert index.search('extractive') == []
+    assert titles(index.search('model')) == ['Rover lands']
+    assert not index.dead  # compacted once a quarter of the postings were dead
+
+
+def test_shared_articles_keep_every_category():
+    index = SearchIndex()
+    index.index('default', [article('Mars rover lands')])
+    index.index('science', [article('Mars rover lands')])
+    (_, result), = index.search('rover')
+    assert result['categories'] == ['default', 'science']
+    assert titles(index.search('rover', category='science')) == ['Mars rover lands']
+    assert index.search('rover', category='sports') == []
+
+
+def test_oldest_articles_are_dropped_past_max_docs():
+    index = SearchIndex(max_docs=2)
+    index.index('science', [article(f'Story {word}') for word in ('alpha', 'beta', 'gamma')])
+    assert len(index) == 2
+    assert index.search('alpha') == []
+    assert 'alpha' not in index.doc_freq
+
+
+def test_limit_and_unknown_terms():
+    index = SearchIndex()
+    index.index('science', [article(f'Rover story {number}') for number in range(5)])
+    assert len(index.search('rover', limit=3)) == 3
+    assert index.search('nothing here') == []
@@ -0,0 +1,36 @@
+from sentence_ranker import condense
+
+TOPIC = 'The city council approved the new river bridge budget today'
+
+
+def article():
+    sentences = [f'{TOPIC} after debate number {index}.' for index in range(10)]
+    sentences.insert(3, 'Weather elsewhere stayed mild and sunny for most of the weekend.')
+    return ' '.join(sentences)
+
+
+def test_short_articles_are_returned_unchanged():
+    text = 'One short article. It has two sentences.'
+    assert condense(text, target_words=50) == text
+
+
+def test_selected_sentences_keep_their_original_order():
+    text = article()
+    sentences = [sentence.strip() for sentence in text.split('.') if sentence.strip()]
+    kept = [sentence.strip() for sentence in condense(text, target_words=40).split('.') if sentence.strip()]
+    assert kept
+    assert [sentences.index(sentence) for sentence in kept] == sorted(sentences.index(sentence) for sentence in kept)
+    # The off-topic sentence is the least central one
+    assert not any(sentence.startswith('Weather') for sentence in kept)
+
+
+def test_word_budget_is_met_with_at_most_one_sentence_over():
+    condensed = condense(article(), target_words=40)
+    sentence_words = len(f'{TOPIC} after debate number 0.'.split())
+    assert 40 <= len(condensed.split()) < 40 + sentence_words
+
+
+def test_only_short_fragments_fall_back_to_the_lead():
+    text = ' '.join(f'Photo {index} credit.' for index in range(20))
+    condensed = condense(text, target_words=10)
+    assert condensed == 'Photo 0 credit. Photo 1 credit. Photo 2 credit. Photo 3 credit.'
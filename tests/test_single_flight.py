@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from single_flight import BuildProgress, SingleFlight
+
+
+def test_concurrent_callers_share_one_build():
+    builds = []
+
+    async def run():
+        flight = SingleFlight()
+
+        async def build():
+            builds.append(1)
+            await asyncio.sleep(0.01)
+            return 'payload'
+
+        results = await asyncio.gather(*(flight.do('science', build) for _ in range(5)))
+        return results, flight.in_flight
+
+    results, in_flight = asyncio.run(run())
+    assert results == ['payload'] * 5
+    assert builds == [1]
+    assert in_flight == {}
+
+
+def test_keys_build_independently_and_rebuild_after_completion():
+    calls = []
+
+    async def run():
+        flight = SingleFlight()
+
+        async def build(key):
+            calls.append(key)
+            return key
+
+        await asyncio.gather(flight.do('a', lambda: build('a')), flight.do('b', lambda: build('b')))
+        await flight.do('a', lambda: build('a'))
+
+    asyncio.run(run())
+    assert sorted(calls) == ['a', 'a', 'b']
+
+
+def test_errors_reach_every_caller():
+    async def run():
+        flight = SingleFlight()
+
+        async def build():
+            await asyncio.sleep(0)
+            raise ValueError('no articles')
+
+        return await asyncio.gather(*(flight.do('k', build) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(run()))
+
+
+def test_cancelled_caller_does_not_cancel_the_build():
+    async def run():
+        flight = SingleFlight()
+
+        async def build():
+            await asyncio.sleep(0.02)
+            return 'done'
+
+        first = asyncio.create_task(flight.do('k', build))
+        second = asyncio.create_task(flight.do('k', build))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == 'done'
+
+
+def test_followers_get_every_item_including_ones_before_they_joined():
+    async def run():
+        progress = BuildProgress()
+
+        async def follow():
+            return [item async for item in progress.follow()]
+
+        progress.append('a')
+        early = asyncio.create_task(follow())
+        await asyncio.sleep(0)
+        progress.append('b')
+        await asyncio.sleep(0)
+        late = asyncio.create_task(follow())
+        await asyncio.sleep(0)
+        progress.append('c')
+        progress.finish()
+        return await early, await late, await follow()
+
+    assert asyncio.run(run()) == (['a', 'b', 'c'],) * 3
+
+
+def test_start_returns_the_running_task_without_waiting():
+    async def run():
+        flight = SingleFlight()
+
+        async def build():
+            await asyncio.sleep(0)
+            return 'payload'
+
+        first = flight.start('k', build)
+        assert flight.start('k', build) is first
+        return await first
+
+    assert asyncio.run(run()) == 'payload'
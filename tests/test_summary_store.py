@@ -0,0 +1,59 @@
+import asyncio
+import itertools
+import types
+import pytest
+import summary_store
+from summary_store import SummaryStore
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+@pytest.fixture(autouse=True)
+def ticking_clock(monkeypatch):
+    # Every access gets a distinct, increasing timestamp so LRU order is deterministic.
+    ticks = itertools.count(1)
+    monkeypatch.setattr(summary_store, 'time', types.SimpleNamespace(time=lambda: next(ticks)))
+
+
+def run(scenario, **options):
+    async def wrapper():
+        redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        try:
+            return await scenario(SummaryStore(redis_client, 'model', **options), redis_client)
+        finally:
+            await redis_client.aclose()
+    return asyncio.run(wrapper())
+
+
+def test_hits_and_misses():
+    async def scenario(store, redis_client):
+        assert await store.get('http://a/1', 'text', 10, 50) is None
+        await store.put('http://a/1', 'text', 10, 50, 'summary')
+        assert await store.get('http://a/1', 'text', 10, 50) == 'summary'
+        # Changed text or summary parameters are a different entry
+        assert await store.get('http://a/1', 'changed text', 10, 50) is None
+        assert await store.get('http://a/1', 'text', 10, 60) is None
+        assert await redis_client.ttl(store.key('http://a/1', 'text', 10, 50)) > 0
+    run(scenario)
+
+
+def test_misses_do_not_add_to_the_lru_index():
+    async def scenario(store, redis_client):
+        await store.get('http://a/1', 'text', 10, 50)
+        assert await redis_client.zcard(store.lru_key) == 0
+    run(scenario)
+
+
+def test_least_recently_used_entries_are_evicted():
+    async def scenario(store, redis_client):
+        for index in range(3):
+            await store.put(f'http://a/{index}', 'text', 10, 50, f'summary {index}')
+        # Reading the oldest entry makes the second one the least recently used
+        assert await store.get('http://a/0', 'text', 10, 50) == 'summary 0'
+        await store.put('http://a/3', 'text', 10, 50, 'summary 3')
+        assert await store.get('http://a/1', 'text', 10, 50) is None
+        for index in (0, 2, 3):
+            assert await store.get(f'http://a/{index}', 'text', 10, 50) == f'summary {index}'
+        assert await redis_client.zcard(store.lru_key) == 3
+        assert not await redis_client.exists(store.key('http://a/1', 'text', 10, 50))
+    run(scenario, max_entries=3)
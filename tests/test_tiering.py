@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+import tiering
+from tiering import TierScheduler
+
+
+class FakePool:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    async def summarize_async(self, texts, min_length, max_length, tier, priority):
+        self.calls.append((tier, priority))
+        await asyncio.sleep(self.delay)
+        return [f'{tier}: {text}' for text in texts]
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    fake = FakePool()
+    monkeypatch.setattr(tiering, 'get_pool', lambda: fake)
+    monkeypatch.setattr(tiering, 'extractive_summary', lambda text: f'extractive: {text}')
+    return fake
+
+
+def summarize(scheduler, texts, budget):
+    async def run():
+        loop = asyncio.get_running_loop()
+        summaries, tiers, upgrade = await scheduler.summarize(texts, 5, 10, loop.time() + budget)
+        return summaries, tiers, await upgrade if upgrade is not None else None
+    return asyncio.run(run())
+
+
+def test_choose_picks_the_best_tier_that_fits():
+    scheduler = TierScheduler()
+    assert scheduler.choose(1, 100) == 'bart'
+    assert scheduler.choose(1, 5) == 'greedy'
+    assert scheduler.choose(1, 0.5) == 'extractive'
+
+
+def test_measurements_move_the_estimate():
+    scheduler = TierScheduler()
+    scheduler.record('bart', 2.0, 2)
+    assert scheduler.seconds_per_article['bart'] == pytest.approx(0.7 * 8.0 + 0.3 * 1.0)
+
+
+def test_tier_within_budget_needs_no_upgrade(pool):
+    summaries, tiers, upgrade = summarize(TierScheduler(), ['a'], 100)
+    assert summaries == ['bart: a'] and tiers == ['bart'] and upgrade is None
+
+
+def test_missed_deadline_is_upgraded(pool):
+    pool.delay = 0.05
+    scheduler = TierScheduler()
+    scheduler.seconds_per_article['bart'] = 0.001
+    summaries, tiers, upgrade = summarize(scheduler, ['a'], 0.01)
+    assert summaries == ['extractive: a'] and tiers == ['extractive']
+    assert upgrade == (['bart: a'], ['bart'])
+
+
+def test_extractive_choice_is_upgraded_at_refresh_priority(pool):
+    summaries, tiers, upgrade = summarize(TierScheduler(), ['a'], 0.1)
+    assert tiers == ['extractive']
+    assert upgrade == (['bart: a'], ['bart'])
+    assert pool.calls == [('bart', 'refresh')]
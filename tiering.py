@@ -0,0 +1,88 @@
+import asyncio
+from sentence_ranker import condense
+from summarizer_pool import get_pool
+
+
+TIER_ORDER = ['bart', 'distilbart', 'greedy', 'extractive']
+# Starting guesses for CPU seconds per article, replaced by measurements as batches finish
+PRIOR_SECONDS_PER_ARTICLE = {'bart': 8.0, 'distilbart': 4.0, 'greedy': 1.5, 'extractive': 0.0}
+SAFETY_FACTOR = 1.5
+EWMA_ALPHA = 0.3
+EXTRACTIVE_SUMMARY_WORDS = 100
+
+
+def extractive_summary(article_text, max_words=EXTRACTIVE_SUMMARY_WORDS):
+    """The article's most central sentences up to about max_words words, needs no model at all."""
+    return condense(article_text, max_words)
+
+
+class TierScheduler:
+    """Picks the best summarization tier that fits a latency budget.
+
+    Each model tier keeps a moving average of measured seconds per article. A
+    request gets the first tier in TIER_ORDER whose estimate, with a safety
+    margin, fits the time left before its deadline. If no model tier fits, or
+    the chosen one still misses the deadline, the caller gets extractive
+    summaries and the model's result is handed back as an upgrade future.
+    """
+
+    def __init__(self):
+        self.seconds_per_article = dict(PRIOR_SECONDS_PER_ARTICLE)
+
+    def record(self, tier, elapsed, count):
+        if count:
+            measured = elapsed / count
+            self.seconds_per_article[tier] = (1 - EWMA_ALPHA) * self.seconds_per_article[tier] + EWMA_ALPHA * measured
+
+    def estimate(self, tier, count):
+        return self.seconds_per_article[tier] * count * SAFETY_FACTOR
+
+    def choose(self, count, budget):
+        for tier in TIER_ORDER:
+            if self.estimate(tier, count) <= budget:
+                return tier
+        return 'extractive'
+
+    async def summarize(self, article_texts, min_length, max_length, deadline, priority='interactive'):
+        """Summarize before the loop time `deadline`.
+
+        Returns (summaries, tiers, upgrade); upgrade is None, or a task that
+        resolves to (summaries, tiers) from the model once it finishes.
+        """
+        loop = asyncio.get_running_loop()
+        count = len(article_texts)
+        if not article_texts:
+            return [], [], None
+        tier = self.choose(count, deadline - loop.time())
+        if tier == 'extractive':
+            # Nobody waits for the model here, so it runs at refresh priority behind interactive work.
+            tier = TIER_ORDER[0]
+            print(f"No model tier fits the deadline for {count} articles, answering with extractive summaries")
+            pool_task = self.start(article_texts, min_length, max_length, tier, 'refresh')
+            return [extractive_summary(text) for text in article_texts], ['extractive'] * count, self.upgrade(pool_task, tier, count)
+        pool_task = self.start(article_texts, min_length, max_length, tier, priority)
+        try:
+            summaries = await asyncio.wait_for(asyncio.shield(pool_task), timeout=max(0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            print(f"Tier '{tier}' missed its deadline for {count} articles, answering with extractive summaries")
+            return [extractive_summary(text) for text in article_texts], ['extractive'] * count, self.upgrade(pool_task, tier, count)
+        return summaries, [tier] * count, None
+
+    def start(self, article_texts, min_length, max_length, tier, priority):
+        """Submit the texts to the pool as a task that feeds its latency back into the tier's estimate"""
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        pool_task = asyncio.ensure_future(get_pool().summarize_async(article_texts, min_length, max_length, tier, priority))
+
+        def record_latency(task):
+            if not task.cancelled() and task.exception() is None:
+                self.record(tier, loop.time() - start_time, len(article_texts))
+
+        pool_task.add_done_callback(record_latency)
+        return pool_task
+
+    def upgrade(self, pool_task, tier, count):
+        async def upgrade():
+            return await pool_task, [tier] * count
+
+        return asyncio.ensure_future(upgrade())